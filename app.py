@@ -1,12 +1,12 @@
-import pandas as pd
-import numpy as np
-import plotly.express as px
+import collections
+import functools
+import os
 
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 
-from data.mock_data import create_mock_data, create_mock_feature_data
+from data.store import ParquetStore, seed_mock_store
 from layout.section1_stability import section1_stability_analysis
 from layout.section2_conversions import section2_conversion_analysis
 from layout.section3_offline import section3_offline_metrics
@@ -15,79 +15,175 @@ from callbacks.section1_callbacks import register_callbacks_section1
 from callbacks.section2_callbacks import register_callbacks_section2
 from callbacks.section3_callbacks import register_callbacks_section3
 from callbacks.section4_callbacks import register_callbacks_section4
+from callbacks.kpi_callbacks import register_kpi_callbacks, scorecards
+from callbacks.static_figures import static_figures
+from callbacks.clientside import month_payload, register_clientside_callbacks
 from components.month_selector import create_month_selector
+from components.scorecard import format_value
+from data.snapshot import load_snapshot
+from metrics.kpis import load_kpis
+from utils.background import background_manager
+from utils.figures import register_payload_monitor
+from utils.instrumentation import register_instrumentation
+from utils.warmup import WarmupScheduler, register_warmup
 
-# Set random seed for reproducibility
-np.random.seed(42)
+# Settings create_app falls back to; the environment overrides the defaults
+DEFAULT_CONFIG = {
+    # Month-partitioned store to serve; the app only reads it (see data/store.py::seed_mock_store)
+    'data_dir': os.environ.get('MONITORING_DATA_DIR', os.path.join('data', 'store')),
+    # Ship all months' aggregates to the browser and switch months client-side
+    'clientside': os.environ.get('MONITORING_CLIENTSIDE', '0') == '1',
+    # Load the snapshot and static figures in create_app rather than on the
+    # first request; with gunicorn --preload forked workers then share them
+    'preload': os.environ.get('MONITORING_PRELOAD', '0') == '1',
+    # Seconds between checks for a new data version, which is then precomputed
+    # in the background before it is served; 0 swaps it in on the next request
+    'warmup_interval': float(os.environ.get('MONITORING_WARMUP_INTERVAL', '5')),
+    # Run the section 3 and 4 callbacks as background jobs (needs dash[diskcache])
+    'background_callbacks': os.environ.get('MONITORING_BACKGROUND', '0') == '1',
+}
 
-# Generate mock data
-df, roc_data, prc_data, cum_metrics_df = create_mock_data()
-feature_importance, feature_drift = create_mock_feature_data()
 
-# Create app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+def preload(store, clientside=False):
+    """Load everything the first page needs: the snapshot, static figures, KPIs and client payload."""
+    load_snapshot(store)
+    static_figures(store)
+    load_kpis(store)
+    if clientside:
+        month_payload(store)
 
-# Set layout
-app.layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.H1("Propensity Model Monitoring Dashboard", className="text-center my-4"),
-            html.P("This dashboard provides insights into the performance and stability of our customer propensity model. Designed for business users, it offers a comprehensive view of model performance, stability, and accuracy.", className="lead text-center mb-5")
-        ])
-    ]),
+
+# Layout is built per page load so months appended to the store show up without a restart
+def serve_layout(store, clientside=False):
+    # Charts that do not depend on the month are drawn once per data version
+    figures = static_figures(store)
+    # Scorecards start at the latest month, the month selector's initial value
+    latest_month = load_snapshot(store).latest_month
+    cards = scorecards(store, latest_month)
+    data_as_of = format_value(load_kpis(store)['run_date'].max(), 'date')
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.H1("Propensity Model Monitoring Dashboard", className="text-center my-4"),
+                html.P("This dashboard provides insights into the performance and stability of our customer propensity model. Designed for business users, it offers a comprehensive view of model performance, stability, and accuracy.", className="lead text-center mb-5")
+            ])
+        ]),
     
-    # Navigation
-    dbc.Row([
-        dbc.Col([
-            html.H4("Jump to Section:", className="text-center mb-3"),
-            dbc.ListGroup(
-                [
-                    dbc.ListGroupItem("Model Scoring Pipeline Stability", href="#section1", external_link=True),
-                    dbc.ListGroupItem("Actual Conversion Rates", href="#section2", external_link=True),
-                    dbc.ListGroupItem("Model Accuracy", href="#section3", external_link=True),
-                    dbc.ListGroupItem("Feature Importance and Drift", href="#section4", external_link=True),
-                ],
-                horizontal=True,
-                className="justify-content-center mb-4"
-            )
-        ])
-    ]),
+        # Navigation
+        dbc.Row([
+            dbc.Col([
+                html.H4("Jump to Section:", className="text-center mb-3"),
+                dbc.ListGroup(
+                    [
+                        dbc.ListGroupItem("Model Scoring Pipeline Stability", href="#section1", external_link=True),
+                        dbc.ListGroupItem("Actual Conversion Rates", href="#section2", external_link=True),
+                        dbc.ListGroupItem("Model Accuracy", href="#section3", external_link=True),
+                        dbc.ListGroupItem("Feature Importance and Drift", href="#section4", external_link=True),
+                    ],
+                    horizontal=True,
+                    className="justify-content-center mb-4"
+                )
+            ])
+        ]),
     
-    # Month Selector
-    dbc.Row([
-        dbc.Col([
-            create_month_selector(df),
-            html.P("Choose the month above that you would like to look at.", className="lead text-center mb-5")
-        ])
-    ]),
+        # Month Selector
+        dbc.Row([
+            dbc.Col([
+                create_month_selector(store),
+                *([dcc.Store(id='month-data', data=month_payload(store))] if clientside else []),
+                html.P("Choose the month above that you would like to look at.", className="lead text-center mb-5")
+            ])
+        ]),
 
-    # Section 1: Model Scoring Pipeline Stability
-    html.Div(section1_stability_analysis(), id="section1"),
+        # Section 1: Model Scoring Pipeline Stability
+        html.Div(section1_stability_analysis(figures, cards), id="section1"),
 
-    # Section 2: Actual Conversion Rates
-    html.Div(section2_conversion_analysis(), id="section2"),
+        # Section 2: Actual Conversion Rates
+        html.Div(section2_conversion_analysis(figures, cards), id="section2"),
 
-    # Section 3: Model Accuracy
-    html.Div(section3_offline_metrics(), id="section3"),
+        # Section 3: Model Accuracy
+        html.Div(section3_offline_metrics(), id="section3"),
 
-    # Section 4: Feature Importance and Drift
-    html.Div(section4_feature_analysis(), id="section4"),
+        # Section 4: Feature Importance and Drift
+        html.Div(section4_feature_analysis(), id="section4"),
     
-    # Footer
-    dbc.Row([
-        dbc.Col([
-            html.Hr(),
-            html.P("Propensity Model Monitoring Dashboard • Data as of April 4, 2025", className="text-center text-muted"),
-        ])
-    ]),
-], fluid=True)
-
-# Register callbacks - pass month selector as a parameter
-register_callbacks_section1(app, df)
-register_callbacks_section2(app, df)
-register_callbacks_section3(app, roc_data, prc_data, cum_metrics_df)
-register_callbacks_section4(app, feature_importance, feature_drift)
+        # Footer
+        dbc.Row([
+            dbc.Col([
+                html.Hr(),
+                html.P(f"Propensity Model Monitoring Dashboard • Data as of {data_as_of}", className="text-center text-muted"),
+            ])
+        ]),
+    ], fluid=True)
+
+
+def validation_layout():
+    """Every component the callbacks refer to, built without touching the data.
+
+    Dash otherwise calls ``serve_layout`` when the layout is assigned, to
+    validate callbacks, which would load the store before the first request.
+    """
+    no_figures = collections.defaultdict(dict)
+    return html.Div([
+        dcc.Dropdown(id='month-selector'),
+        dcc.Store(id='month-data'),
+        section1_stability_analysis(no_figures, {}),
+        section2_conversion_analysis(no_figures, {}),
+        section3_offline_metrics(),
+        section4_feature_analysis(),
+    ])
+
+
+def create_app(config=None):
+    """Build the Dash app for ``config`` (merged over ``DEFAULT_CONFIG``).
+
+    Nothing is read at import time. Data loads on the first request, or
+    here when ``preload`` is set. The store is only read, so every worker
+    can build the app at once; an empty one is seeded beforehand with
+    ``python -m data.store <root> --mock``.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    store = ParquetStore(config['data_dir'])
+    if config['preload']:
+        preload(store, config['clientside'])
+
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+    app.store = store
+
+    # Track the byte size of every callback response against its budget, time
+    # each callback's phases (Server-Timing headers) and serve /metrics
+    register_payload_monitor(app)
+    register_instrumentation(app, store)
+
+    app.validation_layout = validation_layout()
+    app.layout = functools.partial(serve_layout, store, config['clientside'])
+
+    # Register callbacks - the month-dependent figures run in the browser in clientside mode
+    if config['clientside']:
+        register_clientside_callbacks(app)
+    else:
+        # The heavy sections can run as background jobs, keeping web workers free for the rest
+        manager = background_manager(store) if config['background_callbacks'] else None
+        register_callbacks_section1(app, store)
+        register_callbacks_section2(app, store)
+        register_callbacks_section3(app, store, manager)
+        register_callbacks_section4(app, store, manager)
+        register_kpi_callbacks(app, store)
+
+    # New data versions are warmed up off the request path, then swapped in
+    if config['warmup_interval']:
+        app.warmup = WarmupScheduler(store, config['warmup_interval'], clientside=config['clientside'])
+        register_warmup(app, app.warmup)
+    return app
+
+
+def create_server(config=None):
+    """WSGI entry point, e.g. ``gunicorn --preload -w 4 'app:create_server()'``."""
+    return create_app(config).server
+
 
 # Run the app
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # The development server is a single process, so it can seed an empty store itself
+    seed_mock_store(DEFAULT_CONFIG['data_dir'])
+    create_app().run(debug=True)
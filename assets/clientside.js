@@ -0,0 +1,167 @@
+// Client-side month switching: figures are rebuilt from the month-data store
+// payload (callbacks/clientside.py::month_payload) without a server round trip.
+(function () {
+    var DECILES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10];
+    var TOP_N_LABEL = 'Top N Deciles Targeted (highest propensity first)';
+
+    function monthEntry(month, data) {
+        if (!data || !month || !data.months[month]) {
+            return null;
+        }
+        return data.months[month];
+    }
+
+    function sumRows(rows) {
+        return rows.map(function (row) {
+            return row.reduce(function (a, b) { return a + b; }, 0);
+        });
+    }
+
+    function lineFigure(x, y, title, xTitle, yTitle, markers) {
+        return {
+            data: [{type: 'scatter', mode: markers ? 'lines+markers' : 'lines', x: x, y: y, showlegend: false}],
+            layout: {title: {text: title}, xaxis: {title: {text: xTitle}}, yaxis: {title: {text: yTitle}}}
+        };
+    }
+
+    function html(type, props) {
+        return {type: type, namespace: 'dash_html_components', props: props};
+    }
+
+    var monitoring = {
+        // Sections 1 and 2: scorecard value, month-over-month change and its interval
+        scorecards: function (month, data) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+            var entry = monthEntry(month, data);
+            if (!entry) {
+                return data.scorecard_ids.map(function () { return window.dash_clientside.no_update; });
+            }
+            return data.scorecard_ids.map(function (id) {
+                var text = entry.scorecards[id];
+                var children = [html('H3', {children: text.value,
+                                            className: 'card-text text-center d-inline-block me-2'})];
+                if (text.change !== null) {
+                    var arrow = data.arrows[text.direction];
+                    // A change whose interval includes zero is muted, as in components/scorecard.py
+                    var color = text.significant === false ? data.arrows.flat[1] : arrow[1];
+                    children.push(html('Span', {children: [html('I', {className: arrow[0]}), ' ' + text.change],
+                                                className: color}));
+                }
+                if (text.interval !== null) {
+                    children.push(html('Small', {children: text.interval, className: 'd-block text-muted'}));
+                }
+                return children;
+            });
+        },
+
+        // Section 1: customers by decile, one bar trace per bucket
+        decileDistribution: function (month, data) {
+            var entry = monthEntry(month, data);
+            if (!entry) {
+                return window.dash_clientside.no_update;
+            }
+            var traces = data.buckets.map(function (bucket, b) {
+                var x = [], y = [];
+                entry.customers.forEach(function (row, d) {
+                    if (row[b] > 0) {
+                        x.push(DECILES[d]);
+                        y.push(row[b]);
+                    }
+                });
+                return {type: 'bar', name: bucket, x: x, y: y};
+            });
+            return {
+                data: traces,
+                layout: {
+                    title: {text: 'Customer Distribution by Decile'},
+                    barmode: 'relative',
+                    xaxis: {title: {text: 'decile'}},
+                    yaxis: {title: {text: 'customers'}},
+                    legend: {title: {text: 'bucket'}}
+                }
+            };
+        },
+
+        // Section 2: conversions (bars) and conversion rate with 95% bounds (line)
+        decileConversion: function (month, data) {
+            var entry = monthEntry(month, data);
+            if (!entry) {
+                return window.dash_clientside.no_update;
+            }
+            var customers = sumRows(entry.customers);
+            var conversions = sumRows(entry.conversions);
+            var rate = conversions.map(function (c, d) {
+                return customers[d] > 0 ? c / customers[d] * 100 : null;
+            });
+            var errorY;
+            if (entry.decile_interval) {
+                errorY = {
+                    type: 'data',
+                    array: rate.map(function (r, d) { return entry.decile_interval.upper[d] * 100 - r; }),
+                    arrayminus: rate.map(function (r, d) { return r - entry.decile_interval.lower[d] * 100; }),
+                    color: 'darkred'
+                };
+            }
+            return {
+                data: [
+                    {type: 'bar', x: DECILES, y: conversions, name: 'Conversions',
+                     marker: {color: 'steelblue'}, opacity: 0.7, yaxis: 'y'},
+                    {type: 'scatter', x: DECILES, y: rate, name: 'Conversion Rate',
+                     marker: {size: 10, color: 'darkred'}, line: {width: 3, color: 'darkred'},
+                     error_y: errorY, yaxis: 'y2'}
+                ],
+                layout: {
+                    title: {text: 'Conversions and Conversion Rate by Decile (' + entry.label + ')'},
+                    xaxis: {title: {text: 'Decile (1 = Lowest Propensity, 10 = Highest Propensity)'},
+                            type: 'category', categoryorder: 'array', categoryarray: DECILES},
+                    yaxis: {title: {text: 'Number of Conversions'}},
+                    yaxis2: {title: {text: 'Conversion Rate (%)'}, overlaying: 'y', side: 'right'},
+                    plot_bgcolor: 'white',
+                    height: 500,
+                    legend: {orientation: 'h', yanchor: 'bottom', y: 1.02, xanchor: 'right', x: 1}
+                }
+            };
+        },
+
+        // Section 3: ROC, PR and cumulative recall/precision
+        modelMetrics: function (month, data) {
+            var entry = monthEntry(month, data);
+            if (!entry) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update,
+                        window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            return [
+                lineFigure(entry.roc.x, entry.roc.y, entry.roc.title, 'FPR', 'TPR', false),
+                lineFigure(entry.prc.x, entry.prc.y, entry.prc.title, 'Recall', 'Precision', false),
+                lineFigure(DECILES, entry.cumulative.recall, 'Cumulative Recall by Decile',
+                           TOP_N_LABEL, 'Cumulative Recall', true),
+                lineFigure(DECILES, entry.cumulative.precision, 'Cumulative Precision by Decile',
+                           TOP_N_LABEL, 'Cumulative Precision', true)
+            ];
+        },
+
+        // Section 4: feature importance and the drift table records
+        featureAnalysis: function (month, data) {
+            var entry = monthEntry(month, data);
+            if (!entry) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            var figure = {
+                data: [{type: 'bar', orientation: 'h', x: entry.importance.importance,
+                        y: entry.importance.feature}],
+                layout: {title: {text: 'Feature Importance'}, xaxis: {title: {text: 'Importance'}},
+                         yaxis: {title: {text: 'Feature'}}}
+            };
+            var records = entry.drift.rows.map(function (row) {
+                var record = {};
+                entry.drift.columns.forEach(function (column, i) { record[column] = row[i]; });
+                return record;
+            });
+            return [figure, records];
+        }
+    };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {monitoring: monitoring});
+})();
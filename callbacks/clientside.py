@@ -0,0 +1,127 @@
+import weakref
+
+import numpy as np
+from dash import ClientsideFunction
+from dash.dependencies import Input, Output
+
+from callbacks.section3_callbacks import model_metrics
+from components.scorecard import ARROWS, SCORECARDS, scorecard_texts
+from data.snapshot import load_snapshot
+from data.synthetic import BUCKETS
+from metrics.bootstrap import load_intervals
+from metrics.drift import DRIFT_COLUMNS
+from metrics.kpis import month_kpis
+from utils.filters import filter_by_month
+
+PAYLOAD_DECIMALS = 5
+
+# Month payloads per dataset snapshot; a refreshed store yields a new snapshot
+_payloads = weakref.WeakKeyDictionary()
+
+
+def _rounded(values):
+    return np.round(np.asarray(values, dtype=np.float64), PAYLOAD_DECIMALS).tolist()
+
+
+def _month_entry(store, cube, month):
+    idx = cube.month_index(month)
+    entry = {
+        'label': f"{month:%b %Y}",
+        'customers': cube.customers[idx].tolist(),
+        'conversions': cube.conversions[idx].tolist(),
+        'decile_interval': None,
+        'scorecards': scorecard_texts(month_kpis(store, month)),
+    }
+
+    # 95% bootstrap bounds of the decile conversion rates, in decile order
+    intervals = load_intervals(store, month)
+    intervals = intervals[intervals['metric'] == 'decile_conversion_rate']
+    if len(intervals) == 10:
+        intervals = intervals.set_index(intervals['group'].astype(int)).sort_index()
+        entry['decile_interval'] = {'lower': _rounded(intervals['lower']),
+                                    'upper': _rounded(intervals['upper'])}
+
+    roc_data, prc_data, roc_title, prc_title, cum_metrics_df = model_metrics(store, month)
+    entry['roc'] = {'x': _rounded(roc_data['FPR']), 'y': _rounded(roc_data['TPR']), 'title': roc_title}
+    entry['prc'] = {'x': _rounded(prc_data['Recall']), 'y': _rounded(prc_data['Precision']),
+                    'title': prc_title}
+    entry['cumulative'] = {'recall': _rounded(cum_metrics_df['Cumulative Recall']),
+                           'precision': _rounded(cum_metrics_df['Cumulative Precision'])}
+
+    importance = filter_by_month(store, month, table='feature_importance', columns=['Feature', 'Importance'])
+    importance = importance.sort_values('Importance')
+    entry['importance'] = {'feature': importance['Feature'].tolist(),
+                           'importance': _rounded(importance['Importance'])}
+
+    # Drift table rows as columns + value lists rather than repeated records
+    # Only the statistics the store has are shipped; a store without drift gets an empty table
+    drift = filter_by_month(store, month, table='feature_drift')
+    columns = [column for column in DRIFT_COLUMNS if column in drift.columns]
+    drift = drift.reindex(columns=DRIFT_COLUMNS).sort_values('CSI', ascending=False)[columns]
+    entry['drift'] = {
+        'columns': list(drift.columns),
+        'rows': [[value if isinstance(value, str) else round(float(value), PAYLOAD_DECIMALS)
+                  for value in row] for row in drift.itertuples(index=False)],
+    }
+    return entry
+
+
+def month_payload(store):
+    """Every month's aggregates for the client-side callbacks, built once per data version.
+
+    Per month this is the (10, 3) decile x bucket counts, the scorecard
+    texts, the decile interval bounds, the downsampled ROC/PR curves, cumulative metrics and
+    the feature tables: a few KB per month, shipped to the browser once.
+    """
+    snapshot = load_snapshot(store)
+    payload = _payloads.get(snapshot)
+    if payload is None:
+        payload = {
+            'version': snapshot.version,
+            'buckets': BUCKETS,
+            'scorecard_ids': list(SCORECARDS),
+            'arrows': ARROWS,
+            'months': {f"{month:%Y-%m-%d}": _month_entry(store, snapshot.cube, month)
+                       for month in snapshot.months},
+        }
+        _payloads[snapshot] = payload
+    return payload
+
+
+def register_clientside_callbacks(app):
+    """Rebuild the month-dependent figures in the browser from the ``month-data`` store.
+
+    Used instead of the server-side section callbacks, so switching months
+    makes no request. The functions live in ``assets/clientside.js``.
+    """
+    inputs = [Input('month-selector', 'value'), Input('month-data', 'data')]
+    app.clientside_callback(
+        ClientsideFunction(namespace='monitoring', function_name='decileDistribution'),
+        Output('decile-distribution-chart', 'figure'),
+        inputs
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='monitoring', function_name='decileConversion'),
+        Output('decile-conversion-chart', 'figure'),
+        inputs
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='monitoring', function_name='modelMetrics'),
+        [Output('roc-curve', 'figure'),
+         Output('prc-curve', 'figure'),
+         Output('cumulative-recall-chart', 'figure'),
+         Output('cumulative-precision-chart', 'figure')],
+        inputs
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='monitoring', function_name='scorecards'),
+        [Output(card_id, 'children') for card_id in SCORECARDS],
+        inputs,
+        prevent_initial_call=True
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='monitoring', function_name='featureAnalysis'),
+        [Output('feature-importance-chart', 'figure'),
+         Output('feature-drift-table', 'data')],
+        inputs
+    )
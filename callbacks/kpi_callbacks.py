@@ -0,0 +1,26 @@
+from dash.dependencies import Input, Output
+
+from components.scorecard import SCORECARDS, scorecard_children, scorecard_texts
+from metrics.kpis import month_kpis
+from utils.instrumentation import instrument, phase
+
+
+def scorecards(store, month):
+    """Scorecard id -> children for ``month``, from the KPI frame cached per data version."""
+    with phase('data'):
+        kpis = month_kpis(store, month)
+    texts = scorecard_texts(kpis)
+    return {card_id: scorecard_children(text) for card_id, text in texts.items()}
+
+
+def register_kpi_callbacks(app, store):
+    # The layout is drawn with the latest month's scorecards, which is the
+    # selector's initial value, so the callback only runs when it changes
+    @app.callback(
+        [Output(card_id, 'children') for card_id in SCORECARDS],
+        Input('month-selector', 'value'),
+        prevent_initial_call=True
+    )
+    @instrument
+    def update_scorecards(selected_month):
+        return list(scorecards(store, selected_month).values())
@@ -1,29 +1,44 @@
 from dash.dependencies import Input, Output
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
-from utils.filters import filter_by_month
+from data.snapshot import load_snapshot
+from utils.cache import memoize
+from utils.instrumentation import instrument, phase
+from utils.figures import compact_figure, figure_template, go, px
+from data.store import to_month
+from metrics.bootstrap import load_intervals
 
-def register_callbacks_section2(app, df):
+def register_callbacks_section2(app, store):
     
     @app.callback(
         Output('decile-conversion-chart', 'figure'),
         [Input('month-selector', 'value')]
     )
+    @instrument
+    @memoize(store)
     def update_decile_conversion(selected_month):
-        filtered_df = filter_by_month(df, selected_month)
-        
-        # Group by decile
-        decile_conversion = filtered_df.groupby('decile').agg(
-            customers=('customers', 'sum'),
-            conversions=('conversions', 'sum')
-        ).reset_index()
-        
+        with phase('data'):
+            cube = load_snapshot(store).cube
+            # Totals by decile straight from the rollup cube
+            decile_conversion = cube.frame(by=['decile'], months=[selected_month], drop_empty=False)
+            # 95% bootstrap bounds, precomputed per month
+            intervals = load_intervals(store, selected_month)
+
         decile_conversion['conversion_rate'] = (decile_conversion['conversions'] / 
                                               decile_conversion['customers'] * 100)
         
+        # 95% bootstrap error bars
+        intervals = intervals[intervals['metric'] == 'decile_conversion_rate']
+        error_y = None
+        if len(intervals) == len(decile_conversion):
+            intervals = intervals.set_index(intervals['group'].astype(int)).loc[decile_conversion['decile']]
+            error_y = dict(
+                type='data',
+                array=(intervals['upper'].to_numpy() * 100 - decile_conversion['conversion_rate'].to_numpy()),
+                arrayminus=(decile_conversion['conversion_rate'].to_numpy() - intervals['lower'].to_numpy() * 100),
+                color='darkred'
+            )
+        
         # Create figure with secondary y-axis
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig = go.Figure().set_subplots(specs=[[{"secondary_y": True}]])
         
         # Add bar chart for number of conversions
         fig.add_trace(
@@ -44,14 +59,16 @@ def register_callbacks_section2(app, df):
                 y=decile_conversion['conversion_rate'],
                 name='Conversion Rate',
                 marker=dict(size=10, color='darkred'),
-                line=dict(width=3, color='darkred')
+                line=dict(width=3, color='darkred'),
+                error_y=error_y
             ),
             secondary_y=True
         )
         
         # Set titles
         fig.update_layout(
-            title_text=f'Conversions and Conversion Rate by Decile ({selected_month})',
+            template=figure_template(),
+            title_text=f"Conversions and Conversion Rate by Decile ({to_month(selected_month):%b %Y})",
             xaxis_title='Decile (1 = Lowest Propensity, 10 = Highest Propensity)',
             plot_bgcolor='white',
             height=500,
@@ -65,71 +82,63 @@ def register_callbacks_section2(app, df):
         # Ensure x-axis shows all deciles
         fig.update_xaxes(type='category', categoryorder='array', categoryarray=list(range(1, 11)))
         
-        return fig
+        return compact_figure(fig)
 
-    # Stacked bar chart for conversions by decile over time
-    @app.callback(
-        Output('stacked-decile-conversion-chart', 'figure'),
-        Input('stacked-decile-conversion-chart', 'id')
+
+# Stacked bar chart for conversions by decile over time (static per data version, embedded in the layout)
+def stacked_decile_conversion_figure(cube):
+    # Get data up to the second last month
+    # Group by month and decile
+    decile_month_conversion = cube.frame(by=['month', 'decile'], months=cube.months[:-1])
+    
+    fig = px.bar(
+        decile_month_conversion, 
+        x='month', 
+        y='conversions',
+        color='decile',
+        title='Conversions by Decile Over Time (Last 5 Months)',
+        labels={'month': 'Month', 'conversions': 'Number of Conversions', 'decile': 'Decile'},
+        color_continuous_scale='viridis',
+        template=figure_template()
     )
-    def update_stacked_decile_conversion_chart(_):
-        # Get data up to the second last month
-        conversion_data = df[df['month'] != df['month'].unique()[-1]]
-        
-        # Group by month and decile
-        decile_month_conversion = conversion_data.groupby(['month', 'decile'])['conversions'].sum().reset_index()
-        
-        fig = px.bar(
-            decile_month_conversion, 
-            x='month', 
-            y='conversions',
-            color='decile',
-            title='Conversions by Decile Over Time (Last 5 Months)',
-            labels={'month': 'Month', 'conversions': 'Number of Conversions', 'decile': 'Decile'},
-            color_continuous_scale='viridis'
-        )
-        
-        fig.update_layout(
-            xaxis_title='Month',
-            yaxis_title='Number of Conversions',
-            plot_bgcolor='white',
-            legend_title="Decile",
-            height=500
-        )
-        
-        return fig
+    
+    fig.update_layout(
+        xaxis_title='Month',
+        yaxis_title='Number of Conversions',
+        plot_bgcolor='white',
+        legend_title="Decile",
+        height=500
+    )
+    
+    return compact_figure(fig)
 
-    # Total conversions over time
-    @app.callback(
-        Output('total-conversions-chart', 'figure'),
-        Input('total-conversions-chart', 'id')
+
+# Total conversions over time (static per data version, embedded in the layout)
+def total_conversions_figure(cube):
+    # Get data up to the second last month
+    # Group by month
+    monthly_conversions = cube.frame(by=['month'], months=cube.months[:-1])
+    
+    fig = px.line(
+        monthly_conversions, 
+        x='month', 
+        y='conversions',
+        title='Total Conversions Over Time (Last 5 Months)',
+        labels={'month': 'Month', 'conversions': 'Number of Conversions'},
+        markers=True,
+        template=figure_template()
     )
-    def update_total_conversions_chart(_):
-        # Get data up to the second last month
-        conversion_data = df[df['month'] != df['month'].unique()[-1]]
-        
-        # Group by month
-        monthly_conversions = conversion_data.groupby('month')['conversions'].sum().reset_index()
-        
-        fig = px.line(
-            monthly_conversions, 
-            x='month', 
-            y='conversions',
-            title='Total Conversions Over Time (Last 5 Months)',
-            labels={'month': 'Month', 'conversions': 'Number of Conversions'},
-            markers=True
-        )
-        
-        fig.update_traces(
-            line=dict(width=3, color='royalblue'),
-            marker=dict(size=10, color='royalblue')
-        )
-        
-        fig.update_layout(
-            xaxis_title='Month',
-            yaxis_title='Number of Conversions',
-            plot_bgcolor='white',
-            height=500
-        )
-        
-        return fig
+    
+    fig.update_traces(
+        line=dict(width=3, color='royalblue'),
+        marker=dict(size=10, color='royalblue')
+    )
+    
+    fig.update_layout(
+        xaxis_title='Month',
+        yaxis_title='Number of Conversions',
+        plot_bgcolor='white',
+        height=500
+    )
+    
+    return compact_figure(fig)
@@ -1,37 +1,120 @@
+import pandas as pd
 from dash.dependencies import Input, Output
-from utils.filters import filter_by_month
-import plotly.express as px
+from metrics.curves import has_row_level_data, month_curves
+from metrics.histograms import approximate_curves
+from metrics.cumulative import cumulative_metrics_frame
+from data.snapshot import load_snapshot
+from metrics.bootstrap import interval
+from utils.background import background_options, report_progress, reports_progress
+from utils.cache import memoize
+from utils.instrumentation import instrument, phase
+from utils.figures import compact_figure, figure_template, px
 
-def register_callbacks_section3(app, roc_data, prc_data, cum_metrics_df):
+def model_metrics(store, selected_month):
+    """ROC and PR curve data, their titles and the cumulative metrics for one month.
+
+    Shared by the server-side callback and the client-side month payload.
+    """
+    # Curves come from the month's score histograms (O(bins)), then its
+    # row-level scores, and otherwise from the precomputed mock curves
+    snapshot = load_snapshot(store)
+    if snapshot.has_month('score_histograms', selected_month):
+        curves = approximate_curves(store, selected_month)
+        roc_data, prc_data = curves['roc'], curves['prc']
+        roc_title = f"ROC Curve (AUROC = {curves['auroc']:.3f} ± {curves['auroc_error_bound']:.3f})"
+        prc_title = (f"Precision-Recall Curve (AP = {curves['average_precision']:.3f}"
+                     f" ± {curves['average_precision_error_bound']:.3f})")
+    elif has_row_level_data(store, selected_month):
+        curves = month_curves(store, selected_month)
+        roc_data, prc_data = curves['roc'], curves['prc']
+        roc_title = f"ROC Curve (AUROC = {curves['auroc']:.3f})"
+        prc_title = f"Precision-Recall Curve (AP = {curves['average_precision']:.3f})"
+    elif snapshot.has_table('roc') and snapshot.has_table('prc'):
+        # Only the mock store carries precomputed curves
+        roc_data = snapshot.frame('roc')
+        prc_data = snapshot.frame('prc')
+        roc_title = 'ROC Curve'
+        prc_title = 'Precision-Recall Curve'
+    else:
+        # No outcomes recorded for the month yet, e.g. the current month
+        roc_data = pd.DataFrame({'FPR': [], 'TPR': []})
+        prc_data = pd.DataFrame({'Recall': [], 'Precision': []})
+        roc_title = 'ROC Curve (no outcomes yet)'
+        prc_title = 'Precision-Recall Curve (no outcomes yet)'
+    # Bootstrap confidence intervals, precomputed per month
+    auroc_ci = interval(store, selected_month, 'auroc')
+    if auroc_ci is not None:
+        roc_title += f" — 95% CI {auroc_ci[1]:.3f}–{auroc_ci[2]:.3f}"
+    # Whether the AUROC moved since the previous month by more than resampling noise
+    auroc_change = interval(store, selected_month, 'auroc_change')
+    if auroc_change is not None:
+        estimate, lower, upper = auroc_change
+        roc_title += (f"<br><sup>Change vs previous month {estimate:+.3f} (95% CI {lower:+.3f} to {upper:+.3f}"
+                      f"{'' if lower > 0 or upper < 0 else ', within noise'})</sup>")
+    ap_ci = interval(store, selected_month, 'average_precision')
+    if ap_ci is not None:
+        prc_title += f" — 95% CI {ap_ci[1]:.3f}–{ap_ci[2]:.3f}"
+
+    # Cumulative recall/precision from the month's conversions by decile,
+    # left blank while the month has none
+    cum_metrics_df = cumulative_metrics_frame(snapshot.cube, selected_month)
+    if not snapshot.cube.conversions[snapshot.cube.month_index(selected_month)].any():
+        cum_metrics_df = cum_metrics_df.iloc[0:0]
+    return roc_data, prc_data, roc_title, prc_title, cum_metrics_df
+
+
+def register_callbacks_section3(app, store, manager=None):
+    # With a background manager the figures are built in a job process, off
+    # the web worker, with a progress bar (see utils/background.py)
     @app.callback(
         [Output('roc-curve', 'figure'),
          Output('prc-curve', 'figure'),
          Output('cumulative-recall-chart', 'figure'),
          Output('cumulative-precision-chart', 'figure')],
-        [Input('month-selector', 'value')]
+        [Input('month-selector', 'value')],
+        **background_options(manager, 'section3-progress')
     )
+    @reports_progress(manager)
+    @instrument
+    @memoize(store)
     def update_model_metrics(selected_month):
+        with phase('data'):
+            roc_data, prc_data, roc_title, prc_title, cum_metrics_df = model_metrics(store, selected_month)
+        report_progress(1, 5)
+
         # ROC curve
         roc_fig = px.line(roc_data,
                          x='FPR',
                          y='TPR',
-                         title='ROC Curve')
-        
+                         title=roc_title,
+                         template=figure_template())
+        report_progress(2, 5)
+
         # PRC curve
         prc_fig = px.line(prc_data,
                          x='Recall',
                          y='Precision',
-                         title='Precision-Recall Curve')
-        
+                         title=prc_title,
+                         template=figure_template())
+        report_progress(3, 5)
+
         # Cumulative metrics
         cum_recall = px.line(cum_metrics_df,
                             x='Decile',
                             y='Cumulative Recall',
-                            title='Cumulative Recall by Decile')
-        
+                            title='Cumulative Recall by Decile',
+                            labels={'Decile': 'Top N Deciles Targeted (highest propensity first)'},
+                            markers=True,
+                            template=figure_template())
+        report_progress(4, 5)
+
         cum_prec = px.line(cum_metrics_df,
                           x='Decile',
                           y='Cumulative Precision',
-                          title='Cumulative Precision by Decile')
-        
-        return roc_fig, prc_fig, cum_recall, cum_prec
+                          title='Cumulative Precision by Decile',
+                          labels={'Decile': 'Top N Deciles Targeted (highest propensity first)'},
+                          markers=True,
+                          template=figure_template())
+
+        return (compact_figure(roc_fig), compact_figure(prc_fig),
+                compact_figure(cum_recall), compact_figure(cum_prec))
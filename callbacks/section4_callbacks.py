@@ -1,31 +1,47 @@
+import logging
+
 from dash.dependencies import Input, Output
+from metrics.drift import DRIFT_COLUMNS
 from utils.filters import filter_by_month
-import plotly.express as px
-from dash import html
-import pandas as pd
+from utils.background import background_options, report_progress, reports_progress
+from utils.cache import memoize
+from utils.instrumentation import instrument, phase
+from utils.figures import compact_figure, figure_template, px
+
+logger = logging.getLogger(__name__)
 
-def register_callbacks_section4(app, feature_importance, feature_drift):
+def register_callbacks_section4(app, store, manager=None):
+    # Runs as a background job with a progress bar when given a manager
     @app.callback(
         [Output('feature-importance-chart', 'figure'),
          Output('feature-drift-table', 'data')],
-        [Input('month-selector', 'value')]
+        [Input('month-selector', 'value')],
+        **background_options(manager, 'section4-progress')
     )
+    @reports_progress(manager)
+    @instrument
+    @memoize(store)
     def update_feature_analysis(selected_month):
-        print(selected_month)
-        # Filter data for selected month
-        monthly_feature_importance = filter_by_month(feature_importance, selected_month)
-        monthly_feature_drift = filter_by_month(feature_drift, selected_month)
-        print(monthly_feature_importance)
+        logger.debug("update_feature_analysis %s", selected_month)
+        with phase('data'):
+            # Filter data for selected month
+            monthly_feature_importance = filter_by_month(store, selected_month, table='feature_importance',
+                                                         columns=['Feature', 'Importance'])
+            # Stores built from aggregates only carry CSI; sketch statistics show when present
+            monthly_feature_drift = filter_by_month(store, selected_month,
+                                                    table='feature_drift').reindex(columns=DRIFT_COLUMNS)
+        report_progress(1, 2)
         # Generate feature importance visualization
         importance_fig = px.bar(
             monthly_feature_importance.sort_values('Importance', ascending=True),
             y='Feature',
             x='Importance',
             orientation='h',
-            title='Feature Importance'
+            title='Feature Importance',
+            template=figure_template()
         )
         
         # Prepare drift table data
         drift_table_data = monthly_feature_drift.sort_values('CSI', ascending=False).to_dict('records')
         
-        return importance_fig, drift_table_data
\ No newline at end of file
+        return compact_figure(importance_fig), drift_table_data
\ No newline at end of file
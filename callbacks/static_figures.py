@@ -0,0 +1,29 @@
+import weakref
+
+from callbacks.section1_callbacks import stacked_customers_figure, total_customers_figure
+from callbacks.section2_callbacks import stacked_decile_conversion_figure, total_conversions_figure
+from data.snapshot import load_snapshot
+
+# Figures per dataset snapshot; a refreshed store yields a new snapshot, so
+# entries go away with the version they were drawn from
+_figures = weakref.WeakKeyDictionary()
+
+
+def static_figures(store):
+    """Graph id -> figure for the charts that do not depend on the selected month.
+
+    They are drawn once per data version and embedded in the layout, so a
+    page load only fires the month-dependent callbacks.
+    """
+    snapshot = load_snapshot(store)
+    figures = _figures.get(snapshot)
+    if figures is None:
+        cube = snapshot.cube
+        figures = {
+            'total-customers-chart': total_customers_figure(cube),
+            'stacked-customers-chart': stacked_customers_figure(cube),
+            'stacked-decile-conversion-chart': stacked_decile_conversion_figure(cube),
+            'total-conversions-chart': total_conversions_figure(cube),
+        }
+        _figures[snapshot] = figures
+    return figures
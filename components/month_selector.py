@@ -1,17 +1,15 @@
 from dash import dcc
-from utils.filters import get_latest_month, get_all_months
-import pandas as pd
+from data.snapshot import load_snapshot
 
 # Add month selector component
-def create_month_selector(df):
+def create_month_selector(store):
 
-    # Convert the 'month' column to datetime format
-    df['month'] = pd.to_datetime(df['month'], format='%b %Y') # Adjust format if necessary
-    
-    months = get_all_months(df)
+    # Months are parsed once per store version, in the shared snapshot
+    snapshot = load_snapshot(store)
+    months = snapshot.months
     return dcc.Dropdown(
         id='month-selector',
-        options=[{'label': m, 'value': m} for m in months],
-        value=get_latest_month(df),
+        options=[{'label': m.strftime('%b %Y'), 'value': m.strftime('%Y-%m-%d')} for m in months],
+        value=snapshot.latest_month.strftime('%Y-%m-%d'),
         clearable=False
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,113 @@
+import math
+
+from dash import html
+import dash_bootstrap_components as dbc
+
+from data.synthetic import BUCKETS
+
+# Scorecard id -> (KPI column, change column, value format); see metrics/kpis.py
+SCORECARDS = {
+    'kpi-run-date': ('run_date', None, 'date'),
+    'kpi-customers': ('customers', 'customers_change', 'count'),
+    **{f'kpi-share-{bucket.lower()}': (f'share_{bucket}', f'share_change_{bucket}', 'share')
+       for bucket in BUCKETS},
+    **{f'kpi-conversion-rate-{bucket.lower()}': (f'conversion_rate_{bucket}',
+                                                  f'conversion_rate_change_{bucket}', 'rate')
+       for bucket in BUCKETS},
+}
+
+ARROWS = {'up': ("fas fa-arrow-up text-success", "text-success"),
+          'down': ("fas fa-arrow-down text-danger", "text-danger"),
+          'flat': ("fas fa-minus text-muted", "text-muted")}
+
+
+def format_count(value):
+    """2580000 -> '2.58M', 45200 -> '45.2K'."""
+    for size, suffix, decimals in ((1e9, 'B', 2), (1e6, 'M', 2), (1e3, 'K', 1)):
+        if abs(value) >= size:
+            return f"{value / size:.{decimals}f}{suffix}"
+    return f"{value:,.0f}"
+
+
+def format_value(value, kind):
+    if kind == 'date':
+        return f"{value:%B} {value.day}, {value:%Y}"
+    if value is None or math.isnan(value):
+        return "–"
+    if kind == 'count':
+        return format_count(value)
+    return f"{value:.0%}" if kind == 'share' else f"{value:.1%}"
+
+
+def format_change(change, kind):
+    """(text, direction) of a month-over-month change, or (None, None) for the first month.
+
+    Customer counts change by a relative percentage; shares and rates are
+    already percentages, so they change by percentage points.
+    """
+    if change is None or math.isnan(change):
+        return None, None
+    points = round(change * 100, 1)
+    direction = 'up' if points > 0 else 'down' if points < 0 else 'flat'
+    unit = '%' if kind == 'count' else ' pp'
+    text = f"{points:+.1f}" if direction != 'flat' else "0.0"
+    return text + unit, direction
+
+
+def format_interval(lower, upper, kind):
+    """(text, significant) of a change's 95% interval, or (None, None) without one.
+
+    A change is significant when its interval excludes zero.
+    """
+    if lower is None or upper is None or math.isnan(lower) or math.isnan(upper):
+        return None, None
+    unit = '%' if kind == 'count' else ' pp'
+    significant = bool(lower > 0 or upper < 0)
+    text = f"95% CI {lower * 100:+.1f} to {upper * 100:+.1f}{unit}"
+    return text if significant else f"{text}, within noise", significant
+
+
+def scorecard_texts(kpis):
+    """Scorecard id -> {'value', 'change', 'direction', 'interval', 'significant'} for one month's KPI row.
+
+    ``interval`` and ``significant`` are None for cards whose change has no
+    bootstrap interval (see ``month_kpis``).
+    """
+    texts = {}
+    for card_id, (column, change_column, kind) in SCORECARDS.items():
+        change, direction = format_change(kpis[change_column] if change_column else None, kind)
+        interval, significant = (None, None)
+        if change is not None:
+            interval, significant = format_interval(kpis.get(f'{change_column}_lower'),
+                                                    kpis.get(f'{change_column}_upper'), kind)
+        texts[card_id] = {'value': format_value(kpis[column], kind), 'change': change, 'direction': direction,
+                          'interval': interval, 'significant': significant}
+    return texts
+
+
+def scorecard_children(text):
+    """The value, change indicator and, when known, the change's interval shown inside a scorecard.
+
+    A change whose interval includes zero is shown muted rather than green or red.
+    """
+    children = [html.H3(text['value'], className="card-text text-center d-inline-block me-2")]
+    if text['change'] is not None:
+        icon, color = ARROWS[text['direction']]
+        if text['significant'] is False:
+            color = ARROWS['flat'][1]
+        children.append(html.Span([html.I(className=icon), f" {text['change']}"], className=color))
+    if text['interval'] is not None:
+        children.append(html.Small(text['interval'], className="d-block text-muted"))
+    return children
+
+
+def scorecard(title, card_id, children=None, width=4):
+    """A KPI card whose value (``card_id``) is filled in from the KPI engine."""
+    return dbc.Col([
+        dbc.Card([
+            dbc.CardBody([
+                html.H5(title, className="card-title"),
+                html.Div(children, id=card_id, className="text-center my-3")
+            ])
+        ], className="mb-4")
+    ], width=width)
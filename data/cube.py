@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.store import to_month
+from data.synthetic import BUCKETS
+
+AXES = ('month', 'decile', 'bucket')
+DECILES = list(range(1, 11))
+MEASURES = ('customers', 'conversions')
+CUBE_FILE = 'cube.npz'
+
+# Loaded cubes per store root, tagged with the store version they reflect
+_loaded = {}
+
+
+class RollupCube:
+    """Customers and conversions summed per (month, decile, bucket).
+
+    Both measures are dense int64 arrays of shape (months, 10, 3), so any
+    chart or scorecard in sections 1 and 2 is a sum over a few hundred
+    cells instead of a pandas groupby.
+    """
+
+    def __init__(self, months, customers, conversions):
+        self.months = [to_month(month) for month in months]
+        self.customers = np.asarray(customers, dtype=np.int64)
+        self.conversions = np.asarray(conversions, dtype=np.int64)
+        self._month_index = {month: i for i, month in enumerate(self.months)}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the cube from a decile summary frame (create_mock_data layout)."""
+        months = sorted(df['month'].map(to_month).unique())
+        month_idx = df['month'].map(to_month).map({m: i for i, m in enumerate(months)}).to_numpy()
+        decile_idx = df['decile'].to_numpy() - 1
+        bucket_idx = df['bucket'].map({b: i for i, b in enumerate(BUCKETS)}).to_numpy()
+
+        shape = (len(months), len(DECILES), len(BUCKETS))
+        flat = np.ravel_multi_index((month_idx, decile_idx, bucket_idx), shape)
+        size = int(np.prod(shape))
+        customers = np.bincount(flat, weights=df['customers'], minlength=size)
+        conversions = np.bincount(flat, weights=df['conversions'], minlength=size)
+        return cls(months, customers.reshape(shape), conversions.reshape(shape))
+
+    def month_index(self, month):
+        """Position of ``month`` on the month axis."""
+        return self._month_index[to_month(month)]
+
+    def total(self, measure, by=(), months=None):
+        """Sum ``measure`` over every axis not listed in ``by``.
+
+        ``months`` restricts the month axis first. The result keeps the
+        ``by`` axes in cube order, e.g. by=('month', 'bucket') -> (months, 3).
+        """
+        values = getattr(self, measure)
+        if months is not None:
+            values = values[[self.month_index(month) for month in months]]
+        drop = tuple(i for i, axis in enumerate(AXES) if axis not in by)
+        return values.sum(axis=drop)
+
+    def at_month(self, measure, month):
+        """(10, 3) decile x bucket slice of ``measure`` for one month."""
+        return getattr(self, measure)[self.month_index(month)]
+
+    def labels(self, axis, months=None):
+        if axis == 'month':
+            return list(self.months) if months is None else [to_month(month) for month in months]
+        return DECILES if axis == 'decile' else BUCKETS
+
+    def frame(self, by, months=None, drop_empty=True):
+        """Long DataFrame of both measures summed to the ``by`` axes."""
+        by = [axis for axis in AXES if axis in by]
+        sums = {measure: self.total(measure, by=by, months=months).ravel() for measure in MEASURES}
+
+        grids = np.meshgrid(*[np.asarray(self.labels(axis, months), dtype=object) for axis in by],
+                            indexing='ij')
+        data = {axis: grid.ravel() for axis, grid in zip(by, grids)}
+        data.update(sums)
+        frame = pd.DataFrame(data)
+        if 'month' in by:
+            frame['month'] = pd.to_datetime(frame['month'])
+        if 'decile' in by:
+            frame['decile'] = frame['decile'].astype(np.int64)
+        if drop_empty:
+            frame = frame[frame['customers'] > 0].reset_index(drop=True)
+        return frame
+
+    def with_month(self, month, customers, conversions):
+        """New cube with one month's (10, 3) slices added or replaced.
+
+        Only that month is touched; every other month is copied as-is.
+        """
+        month = to_month(month)
+        months = sorted(set(self.months) | {month})
+        index = months.index(month)
+        if month in self._month_index:
+            new_customers = self.customers.copy()
+            new_conversions = self.conversions.copy()
+        else:
+            new_customers = np.insert(self.customers, index, 0, axis=0)
+            new_conversions = np.insert(self.conversions, index, 0, axis=0)
+        new_customers[index] = customers
+        new_conversions[index] = conversions
+        return RollupCube(months, new_customers, new_conversions)
+
+    def save(self, path):
+        # Write then rename so a concurrent load never sees a partial file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, months=np.array(self.months, dtype='datetime64[ns]'),
+                     customers=self.customers, conversions=self.conversions)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(pd.to_datetime(arrays['months']), arrays['customers'], arrays['conversions'])
+
+
+def build_cube(store):
+    """Build the cube from the store's decile summary and persist it next to the tables."""
+    cube = RollupCube.from_frame(store.read('decile_summary',
+                                            columns=['month', 'decile', 'bucket', 'customers', 'conversions']))
+    cube.save(os.path.join(store.root, CUBE_FILE))
+    return cube
+
+
+def update_cube_month(store, month):
+    """Refresh one month of the persisted cube from that month's decile summary."""
+    path = os.path.join(store.root, CUBE_FILE)
+    if not os.path.exists(path):
+        return build_cube(store)
+    summary = store.read('decile_summary', months=[month],
+                         columns=['month', 'decile', 'bucket', 'customers', 'conversions'])
+    month_cube = RollupCube.from_frame(summary)
+    cube = RollupCube.load(path).with_month(month, month_cube.customers[0], month_cube.conversions[0])
+    cube.save(path)
+    return cube
+
+
+def load_cube(store):
+    """The store's cube, reloaded only when the store version has moved on.
+
+    Builds the cube if the store predates it.
+    """
+    version = store.version()
+    loaded = _loaded.get(store.root)
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    path = os.path.join(store.root, CUBE_FILE)
+    cube = RollupCube.load(path) if os.path.exists(path) else build_cube(store)
+    _loaded[store.root] = (version, cube)
+    return cube
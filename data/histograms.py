@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# Fixed score bins shared by every month and segment so histograms merge by addition.
+# Bins are uniform in logit space, which keeps resolution where propensity scores
+# actually sit (well below 0.5) instead of wasting most bins on empty high scores.
+N_SCORE_BINS = 1024
+LOGIT_RANGE = (-12.0, 12.0)
+
+
+def score_bins(scores):
+    """Histogram bin index (0 .. N_SCORE_BINS - 1) of each score in (0, 1)."""
+    scores = np.clip(np.asarray(scores, dtype=np.float64), 1e-12, 1 - 1e-12)
+    logits = np.log(scores) - np.log1p(-scores)
+    lo, hi = LOGIT_RANGE
+    idx = np.floor((logits - lo) / (hi - lo) * N_SCORE_BINS).astype(np.int64)
+    return np.clip(idx, 0, N_SCORE_BINS - 1)
+
+
+def bin_upper_edges():
+    """Score at the top of each bin."""
+    lo, hi = LOGIT_RANGE
+    logits = lo + (hi - lo) * np.arange(1, N_SCORE_BINS + 1) / N_SCORE_BINS
+    return 1.0 / (1.0 + np.exp(-logits))
+
+
+def build_histograms(scores, labels, segments=None, n_segments=None):
+    """(segments, 2, bins) counts; axis 1 is label (0 = not converted, 1 = converted)."""
+    bins = score_bins(scores)
+    labels = np.asarray(labels, dtype=np.int64)
+    if segments is None:
+        segments = np.zeros(bins.size, dtype=np.int64)
+    segments = np.asarray(segments, dtype=np.int64)
+    if n_segments is None:
+        n_segments = int(segments.max()) + 1 if segments.size else 1
+
+    key = (segments * 2 + labels) * N_SCORE_BINS + bins
+    counts = np.bincount(key, minlength=n_segments * 2 * N_SCORE_BINS)
+    return counts.reshape(n_segments, 2, N_SCORE_BINS)
+
+
+def histogram_frame(counts, model=0):
+    """Long frame of the non-empty histogram cells, as stored in ``score_histograms``."""
+    segment, label, bin_idx = np.nonzero(counts)
+    return pd.DataFrame({
+        'model': np.full(segment.size, model, dtype=np.int8),
+        'segment': segment.astype(np.int16),
+        'label': label.astype(np.int8),
+        'bin': bin_idx.astype(np.int16),
+        'count': counts[segment, label, bin_idx].astype(np.int64),
+    })
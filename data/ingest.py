@@ -0,0 +1,223 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data.cube import update_cube_month
+from data.histograms import N_SCORE_BINS, build_histograms, histogram_frame
+from data.sketches import KLLSketch
+from data.store import to_month
+from data.synthetic import BUCKETS, LOW_CUTOFF, MEDIUM_CUTOFF, count_decile_buckets, summary_frame
+from metrics.bootstrap import compute_intervals
+from metrics.drift import compute_feature_drift, feature_columns
+from metrics.feature_sketches import build_feature_sketches
+
+DECILE_QUANTILES = np.linspace(0.1, 0.9, 9)
+BUCKET_QUANTILES = np.array([LOW_CUTOFF, MEDIUM_CUTOFF])
+DEFAULT_CHUNK_SIZE = 500_000
+DEFAULT_SKETCH_K = 1000
+
+
+def _chunk_tasks(paths):
+    """Split score files into independently readable pieces (Parquet row groups or whole CSVs)."""
+    tasks = []
+    for path in paths:
+        if path.endswith('.parquet'):
+            n_groups = pq.ParquetFile(path).num_row_groups
+            tasks.extend((path, [group]) for group in range(n_groups))
+        else:
+            tasks.append((path, None))
+    return tasks
+
+
+def _iter_task(task, columns, chunk_size):
+    path, row_groups = task
+    if path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=row_groups,
+                                               columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def iter_score_chunks(paths, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunk_size`` rows from Parquet or CSV score files."""
+    for task in _chunk_tasks(paths):
+        yield from _iter_task(task, columns, chunk_size)
+
+
+def _sketch_task(args):
+    task, column, chunk_size, k, seed = args
+    sketch = KLLSketch(k=k, seed=seed)
+    for chunk in _iter_task(task, [column], chunk_size):
+        sketch.update(chunk[column].to_numpy())
+    return sketch
+
+
+def sketch_scores(paths, column='score', chunk_size=DEFAULT_CHUNK_SIZE,
+                  k=DEFAULT_SKETCH_K, processes=None, seed=0):
+    """First pass: one KLL sketch per file piece, merged into the sketch of all scores.
+
+    With ``processes`` > 1 the pieces are sketched in a process pool; only
+    the small sketches travel back to the parent.
+    """
+    tasks = [(task, column, chunk_size, k, seed + i) for i, task in enumerate(_chunk_tasks(paths))]
+    if processes and processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            sketches = list(pool.map(_sketch_task, tasks))
+    else:
+        sketches = [_sketch_task(task) for task in tasks]
+
+    merged = KLLSketch(k=k, seed=seed)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def score_edges(sketch):
+    """Decile and bucket score cut points from a sketch of the month's scores."""
+    return sketch.quantiles(DECILE_QUANTILES), sketch.quantiles(BUCKET_QUANTILES)
+
+
+def score_run_date(paths):
+    """When a month's scores were produced: the day the newest score file was written."""
+    return pd.Timestamp.fromtimestamp(max(os.path.getmtime(path) for path in paths)).normalize()
+
+
+def assign_from_edges(scores, decile_edges, bucket_edges):
+    """Decile (1-10) and bucket code for each score given precomputed edges."""
+    deciles = (np.searchsorted(decile_edges, scores, side='right') + 1).astype(np.int8)
+    buckets = np.searchsorted(bucket_edges, scores, side='right').astype(np.int8)
+    return deciles, buckets
+
+
+def ingest_month(store, month, paths, model=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 k=DEFAULT_SKETCH_K, processes=None, seed=0, run_date=None):
+    """Two-pass streaming ingest of one month of raw scores.
+
+    Pass 1 sketches the score distribution to find decile and bucket edges;
+    pass 2 re-reads the files chunk by chunk, assigns decile and bucket,
+    streams the ``scores`` (and ``conversions``, when the files carry a
+    ``converted`` column) partitions to the store and accumulates the decile
+    summary and the per-segment score histograms. Files may carry an integer
+    ``segment`` column; without one every customer is segment 0. Memory is
+    bounded by ``chunk_size`` and the sketch, never by the size of the
+    files. The summary rows carry ``run_date``, when the scores were
+    produced (default: the day the newest file was written), which the
+    run-date scorecard and the footer show. Returns the
+    (decile_edges, bucket_edges) used.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    month = to_month(month)
+    run_date = score_run_date(paths) if run_date is None else pd.Timestamp(run_date)
+
+    sketch = sketch_scores(paths, chunk_size=chunk_size, k=k, processes=processes, seed=seed)
+    decile_edges, bucket_edges = score_edges(sketch)
+
+    customers = np.zeros((10, len(BUCKETS)), dtype=np.int64)
+    conversions = np.zeros((10, len(BUCKETS)), dtype=np.int64)
+    histograms = np.zeros((0, 2, N_SCORE_BINS), dtype=np.int64)
+    with store.writer('scores', month) as scores_writer, \
+            store.writer('conversions', month) as conversions_writer:
+        for chunk in iter_score_chunks(paths, chunk_size=chunk_size):
+            scores = chunk['score'].to_numpy()
+            deciles, buckets = assign_from_edges(scores, decile_edges, bucket_edges)
+            converted = chunk['converted'].to_numpy() if 'converted' in chunk else None
+            segments = (chunk['segment'].to_numpy(dtype=np.int16) if 'segment' in chunk
+                        else np.zeros(len(chunk), dtype=np.int16))
+
+            scores_writer.write(pd.DataFrame({
+                'model': np.full(len(chunk), model, dtype=np.int8),
+                'customer_id': chunk['customer_id'].to_numpy(),
+                'segment': segments,
+                'score': scores.astype(np.float32),
+                'decile': deciles,
+                'bucket': pd.Categorical.from_codes(buckets, categories=BUCKETS),
+            }))
+            if converted is not None:
+                conversions_writer.write(pd.DataFrame({
+                    'customer_id': chunk['customer_id'].to_numpy(),
+                    'converted': converted.astype(bool),
+                }))
+
+            chunk_customers, chunk_conversions = count_decile_buckets(deciles, buckets, converted)
+            customers += chunk_customers
+            conversions += chunk_conversions
+
+            if converted is not None:
+                chunk_histograms = build_histograms(scores, converted, segments)
+                histograms = _add_padded(histograms, chunk_histograms)
+
+    store.write('decile_summary', summary_frame(run_date, customers, conversions, month=month),
+                month=month)
+    if histograms.size:
+        store.write('score_histograms', histogram_frame(histograms, model=model), month=month)
+    refresh_month(store, month)
+    return decile_edges, bucket_edges
+
+
+def _add_padded(total, part):
+    """Add two (segments, 2, bins) histograms that may cover different segment counts."""
+    if part.shape[0] > total.shape[0]:
+        total = np.concatenate([total, np.zeros((part.shape[0] - total.shape[0],) + total.shape[1:],
+                                                dtype=total.dtype)])
+    total[:part.shape[0]] += part
+    return total
+
+
+def append_month(store, month, tables):
+    """Append (or replace) one month of already-aggregated data.
+
+    ``tables`` maps table name to that month's frame, e.g. ``decile_summary``,
+    ``feature_importance`` and ``feature_drift``. Only the month's partitions
+    are written and only its slice of the derived structures is rebuilt, so
+    a monthly refresh costs one month of work. Returns the new store version.
+    """
+    month = to_month(month)
+    for table, frame in tables.items():
+        store.write(table, frame, month=month)
+    return refresh_month(store, month)
+
+
+def refresh_month(store, month):
+    """Rebuild the derived structures for one month and publish a new store version.
+
+    Bootstrap intervals are recomputed for the month and for the month after
+    it, whose month-on-month change depends on it, and the feature sketches
+    and drift are rebuilt for the month when it has row-level features.
+    Readers keyed on the store version (``load_cube`` and the callbacks
+    behind it) pick up the change on their next request.
+    """
+    month = to_month(month)
+    cube = update_cube_month(store, month)
+    affected = cube.months[cube.month_index(month):cube.month_index(month) + 2]
+    # load_cube would still return the published cube until mark_updated
+    compute_intervals(store, affected, processes=1, cube=cube)
+    if month in store.months('features'):
+        build_feature_sketches(store, month, feature_columns(store))
+        compute_feature_drift(store, [month])
+    return store.mark_updated(affected)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from data.store import ParquetStore
+
+    parser = argparse.ArgumentParser(description='Stream one month of raw scores into the store.')
+    parser.add_argument('store')
+    parser.add_argument('month', help="e.g. '2025-04' or 'Apr 2025'")
+    parser.add_argument('paths', nargs='+', help='Parquet or CSV files with customer_id, score[, converted]')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--run-date', default=None,
+                        help="when the scores were produced (default: the newest file's date)")
+    args = parser.parse_args()
+
+    store = ParquetStore(args.store)
+    ingest_month(store, args.month, args.paths, chunk_size=args.chunk_size,
+                 processes=args.processes, run_date=args.run_date)
@@ -7,6 +7,14 @@ today = datetime.datetime(2025, 4, 5)
 dates = [(today - datetime.timedelta(days=30*i)).replace(day=4) for i in range(6)]
 dates.reverse()  # Oldest to newest
 
+# Model features
+FEATURES = [
+    'Magic Level', 'Horn Toughness', 'Avg Poop Weight', 
+    'Number of Legs', 'Sparkle Factor', 'Rainbow Intensity',
+    'Mane Length', 'Happiness Index', 'Cupcake Consumption', 
+    'Friendship Power'
+]
+
 # Create mock data
 def create_mock_data():
     # Total customers per month (around 2.5 million)
@@ -129,31 +137,11 @@ def create_mock_data():
     roc_data = pd.DataFrame({'FPR': roc_x, 'TPR': roc_y})
     prc_data = pd.DataFrame({'Recall': prc_x, 'Precision': prc_y})
     
-    # Cumulative recall and precision by decile
-    cum_metrics = []
-    
-    recall_by_decile = [0.3, 0.45, 0.57, 0.67, 0.75, 0.82, 0.88, 0.93, 0.97, 1.0]
-    precision_by_decile = [0.1, 0.09, 0.08, 0.07, 0.06, 0.05, 0.04, 0.03, 0.02, 0.01]
-    
-    for i, decile in enumerate(range(1, 11)):
-        cum_metrics.append({
-            'Decile': decile,
-            'Cumulative Recall': recall_by_decile[i],
-            'Cumulative Precision': precision_by_decile[i]
-        })
-    
-    cum_metrics_df = pd.DataFrame(cum_metrics)
-    
-    return df, roc_data, prc_data, cum_metrics_df
+    return df, roc_data, prc_data
 
 def create_mock_feature_data():
     # Feature importance and drift data
-    features = [
-        'Magic Level', 'Horn Toughness', 'Avg Poop Weight', 
-        'Number of Legs', 'Sparkle Factor', 'Rainbow Intensity',
-        'Mane Length', 'Happiness Index', 'Cupcake Consumption', 
-        'Friendship Power'
-    ]
+    features = FEATURES
     
     # Generate time series feature importance and drift data
     feature_importance_ts = []
@@ -0,0 +1,266 @@
+import contextlib
+import os
+import threading
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.cube import load_cube
+from data.store import MANIFEST_FILE, to_month
+
+# Current snapshot per store root; entries are replaced whole, never modified
+_snapshots = {}
+_lock = threading.Lock()
+
+# Store roots whose new snapshots are swapped in by a background warm-up
+# (utils/warmup.py) rather than by the first request to see the new manifest
+_managed = set()
+
+# Per-thread snapshot overrides, set by using_snapshot()
+_local = threading.local()
+
+# Small tables read whole when a snapshot is built, so a snapshot never
+# serves rows written for a later version: month-partitioned ones as month
+# indexes, unpartitioned ones (the mock curves) as frames
+SNAPSHOT_TABLES = ('decile_summary', 'feature_importance', 'feature_drift', 'confidence_intervals')
+SNAPSHOT_FRAMES = ('roc', 'prc')
+# Times a snapshot is rebuilt when the manifest is replaced while it loads
+BUILD_ATTEMPTS = 5
+
+
+class MonthIndex:
+    """Rows of a table split by month once, with the months in sorted order.
+
+    Every month's frame is sliced when the index is built, and registered
+    under both its timestamp and its '%Y-%m-%d' string (the month selector's
+    value). ``get`` is then a dict lookup that returns the same frame on
+    every call: no scan and no new frame.
+    """
+
+    def __init__(self, parts, empty):
+        self._parts = {}
+        for month, part in parts:
+            self._parts[month] = part
+            self._parts[f"{month:%Y-%m-%d}"] = part
+        self.months = tuple(sorted(month for month, _ in parts))
+        self._empty = empty
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Index a frame with a ``month`` column, sorted by month so each month is one slice."""
+        # Parse each distinct label once ('Apr 2025', ISO strings or timestamps)
+        codes, labels = pd.factorize(frame['month'])
+        keys = np.array([to_month(label) for label in labels], dtype='datetime64[ns]')[codes]
+        order = np.argsort(keys, kind='stable')
+        frame, keys = frame.iloc[order].reset_index(drop=True), keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, int)
+        stops = np.r_[starts[1:], len(keys)].astype(int)
+        parts = [(to_month(keys[start]), frame.iloc[start:stop]) for start, stop in zip(starts, stops)]
+        return cls(parts, frame.iloc[0:0])
+
+    @classmethod
+    def from_store(cls, store, table, columns=None):
+        """Index a month-partitioned table, reading each partition once.
+
+        Partitions that share a schema are converted to pandas in one go and
+        sliced, which is most of the cost for many small partitions. A table
+        the store does not have gives an empty index whose frames carry only
+        ``columns``, so callers name the columns they go on to use.
+        """
+        months = store.months(table)
+        tables = [store.read_arrow(table, months=[month], columns=columns) for month in months]
+        if not tables:
+            return cls([], pd.DataFrame(columns=columns))
+        if all(part.schema.equals(tables[0].schema) for part in tables[1:]):
+            frame = pa.concat_tables(tables).to_pandas()
+            stops = np.cumsum([part.num_rows for part in tables])
+            parts = [(month, frame.iloc[stop - part.num_rows:stop])
+                     for month, part, stop in zip(months, tables, stops)]
+        else:
+            parts = [(month, part.to_pandas()) for month, part in zip(months, tables)]
+        return cls(parts, parts[0][1].iloc[0:0])
+
+    def get(self, month):
+        """The rows for ``month`` (an empty frame if the month has none)."""
+        part = self._parts.get(month)
+        if part is None:
+            part = self._parts.get(to_month(month), self._empty)
+        return part
+
+    def select(self, columns):
+        """A ``MonthIndex`` of the same months holding only ``columns``."""
+        columns = list(columns)
+        return MonthIndex([(month, self.get(month)[columns]) for month in self.months],
+                          self._empty.reindex(columns=columns))
+
+    @property
+    def latest_month(self):
+        return self.months[-1]
+
+
+class DatasetSnapshot:
+    """Read-only view of the store at one version, shared by every request.
+
+    Months are parsed to month-start timestamps once, when the snapshot is
+    built, and the cube's arrays are flagged read-only, so callbacks can
+    share a snapshot across threads without copying or re-parsing. The
+    small per-month tables (``SNAPSHOT_TABLES``) and the months each table
+    has are read at the same time, so they belong to the snapshot's version
+    too. A refresh builds a new snapshot and swaps it in. Requests that
+    already hold the old one finish against the view they started with.
+    """
+
+    def __init__(self, store, manifest, cube):
+        self.store = store
+        self.version = manifest['version']
+        self.month_versions = MappingProxyType(dict(manifest['months']))
+        self.cube = cube
+        self.months = tuple(cube.months)
+        self.tables = frozenset(store.tables())
+        self.table_months = MappingProxyType({table: frozenset(store.months(table)) for table in self.tables})
+        cube.customers.setflags(write=False)
+        cube.conversions.setflags(write=False)
+        self._indexes = {(table, None): MonthIndex.from_store(store, table)
+                         for table in SNAPSHOT_TABLES if table in self.tables}
+        self._frames = {table: store.read(table) for table in SNAPSHOT_FRAMES if table in self.tables}
+        self._index_lock = threading.Lock()
+
+    @property
+    def latest_month(self):
+        return self.months[-1]
+
+    def month_version(self, month):
+        """Store version at which ``month`` was last written (None if never)."""
+        return self.month_versions.get(f"{to_month(month):%Y-%m}")
+
+    def has_month(self, table, month):
+        """Whether ``table`` had a partition for ``month`` at this version."""
+        return to_month(month) in self.table_months.get(table, ())
+
+    def has_table(self, table):
+        """Whether the store had ``table`` at this version."""
+        return table in self.tables
+
+    def frame(self, table):
+        """One of the unpartitioned ``SNAPSHOT_FRAMES`` as read with the snapshot (None if absent)."""
+        return self._frames.get(table)
+
+    def month_index(self, table, columns=None):
+        """``MonthIndex`` of one of the small per-month tables, built once per snapshot.
+
+        ``SNAPSHOT_TABLES`` are projected from the rows read with the
+        snapshot; any other table is read on first use.
+        """
+        key = (table, None if columns is None else tuple(columns))
+        index = self._indexes.get(key)
+        if index is None:
+            with self._index_lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    full = self._indexes.get((table, None))
+                    if full is not None:
+                        index = full.select(columns)
+                    else:
+                        index = MonthIndex.from_store(self.store, table, columns)
+                    self._indexes[key] = index
+        return index
+
+
+def _manifest_stamp(store):
+    # The manifest is only ever replaced by a rename, so its inode and
+    # mtime change with every new version
+    try:
+        stat = os.stat(os.path.join(store.root, MANIFEST_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def build_snapshot(store):
+    """(manifest stamp, new snapshot) of the store as it is now, without publishing it.
+
+    The stamp is read before and after the manifest, cube and tables are
+    loaded. If a new version landed meanwhile the snapshot is built again,
+    so everything in it comes from the version the stamp names.
+    """
+    for _ in range(BUILD_ATTEMPTS):
+        stamp = _manifest_stamp(store)
+        snapshot = DatasetSnapshot(store, store.manifest(), load_cube(store))
+        if _manifest_stamp(store) == stamp:
+            break
+    return stamp, snapshot
+
+
+def publish_snapshot(store, stamp, snapshot):
+    """Make ``snapshot`` the one every later ``load_snapshot`` call returns."""
+    _snapshots[store.root] = (stamp, snapshot)
+
+
+def published_snapshot(store):
+    """The snapshot requests of ``store`` are served from, or None before the first one."""
+    current = _snapshots.get(store.root)
+    return None if current is None else current[1]
+
+
+def is_current(store):
+    """Whether the published snapshot of ``store`` reflects its manifest on disk."""
+    current = _snapshots.get(store.root)
+    return current is not None and current[0] == _manifest_stamp(store)
+
+
+def manage_snapshots(store, managed=True):
+    """Leave swapping in new versions of ``store`` to a background warm-up.
+
+    Requests then keep getting the published snapshot, without checking
+    the manifest, until ``publish_snapshot`` replaces it.
+    """
+    if managed:
+        _managed.add(store.root)
+    else:
+        _managed.discard(store.root)
+
+
+@contextlib.contextmanager
+def using_snapshot(snapshot):
+    """Make ``load_snapshot`` return ``snapshot`` for its store on this thread.
+
+    Lets a warm-up fill every per-version cache for a snapshot that has not
+    been published yet.
+    """
+    previous = getattr(_local, 'snapshots', {})
+    _local.snapshots = {**previous, snapshot.store.root: snapshot}
+    try:
+        yield snapshot
+    finally:
+        _local.snapshots = previous
+
+
+def load_snapshot(store):
+    """The current snapshot of ``store``, rebuilt only when the manifest changes.
+
+    The common path is one ``stat`` of the manifest. A new snapshot is built
+    under a lock so concurrent requests build it once, then published with a
+    single dict assignment. Stores under ``manage_snapshots`` skip the check
+    once a snapshot is published.
+    """
+    override = getattr(_local, 'snapshots', None)
+    if override and store.root in override:
+        return override[store.root]
+
+    current = _snapshots.get(store.root)
+    if current is not None and store.root in _managed:
+        return current[1]
+
+    stamp = _manifest_stamp(store)
+    if current is not None and current[0] == stamp:
+        return current[1]
+
+    with _lock:
+        current = _snapshots.get(store.root)
+        if current is not None and current[0] == stamp:
+            return current[1]
+        stamp, snapshot = build_snapshot(store)
+        publish_snapshot(store, stamp, snapshot)
+        return snapshot
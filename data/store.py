@@ -0,0 +1,380 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.histograms import build_histograms, histogram_frame
+from data.synthetic import BUCKETS, aggregate_month, feature_names, iter_synthetic_months
+
+PARTITION_PREFIX = 'month='
+PART_FILE = 'part-0.parquet'
+COLUMNS_FILE = 'columns.npy'
+COLUMN_NAMES_FILE = 'columns.json'
+MANIFEST_FILE = '_manifest.json'
+
+
+def to_month(value):
+    """Normalise a month label ('Apr 2025'), ISO string or timestamp to the first of the month."""
+    return pd.Timestamp(value).to_period('M').to_timestamp()
+
+
+def partition_name(month):
+    """Directory name of a month partition, e.g. 'month=2025-04'."""
+    return f"{PARTITION_PREFIX}{to_month(month):%Y-%m}"
+
+
+def _to_arrow(frame):
+    frame = frame.reset_index(drop=True)
+    if 'month' in frame.columns:
+        frame = frame.assign(month=frame['month'].map(to_month).astype('datetime64[ns]'))
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+class PartitionWriter:
+    """Appends frames to one Parquet partition, one row group per frame.
+
+    Rows go to a temp file that is renamed over the partition on close, so
+    readers never see half a partition and memory stays at one chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = path + '.tmp'
+        self._writer = None
+
+    def write(self, frame):
+        table = _to_arrow(frame)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._tmp_path, self.path)
+            self._writer = None
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.remove(self._tmp_path)
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ParquetStore:
+    """Month-partitioned Parquet tables on local disk.
+
+    Each table lives in ``<root>/<table>/month=YYYY-MM/part-0.parquet``.
+    Reads only open the partitions that were asked for, only decode the
+    requested columns and memory-map the files, so callbacks never hold
+    more than the slice they are drawing.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def manifest(self):
+        """Store version and the version at which each month was last written."""
+        path = os.path.join(self.root, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {'version': 0, 'months': {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def version(self):
+        return self.manifest()['version']
+
+    def mark_updated(self, months):
+        """Bump the store version and record which months changed in it."""
+        manifest = self.manifest()
+        manifest['version'] += 1
+        for month in months:
+            manifest['months'][f"{to_month(month):%Y-%m}"] = manifest['version']
+
+        path = os.path.join(self.root, MANIFEST_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        return manifest['version']
+
+    def tables(self):
+        """Names of the tables in the store."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def has_table(self, table):
+        return os.path.isdir(os.path.join(self.root, table))
+
+    def months(self, table):
+        """Sorted month timestamps that have a partition for ``table``."""
+        table_dir = os.path.join(self.root, table)
+        if not os.path.isdir(table_dir):
+            return []
+        return sorted(
+            pd.Timestamp(name[len(PARTITION_PREFIX):])
+            for name in os.listdir(table_dir)
+            if name.startswith(PARTITION_PREFIX)
+        )
+
+    def _path(self, table, month=None):
+        if month is None:
+            return os.path.join(self.root, table, PART_FILE)
+        return os.path.join(self.root, table, partition_name(month), PART_FILE)
+
+    def write(self, table, frame, month=None):
+        """Write ``frame`` as the partition for ``month`` (or as an unpartitioned table).
+
+        Any existing partition for that month is replaced. A ``month`` column
+        is normalised to month-start timestamps so every table compares the
+        same way.
+        """
+        with self.writer(table, month=month) as writer:
+            writer.write(frame)
+
+    def writer(self, table, month=None):
+        """PartitionWriter that streams chunks into the partition for ``month``."""
+        return PartitionWriter(self._path(table, month))
+
+    def write_by_month(self, table, frame):
+        """Split ``frame`` on its ``month`` column and write one partition per month."""
+        months = frame['month'].map(to_month)
+        for month, part in frame.groupby(months, sort=True):
+            self.write(table, part, month=month)
+
+    def read_arrow(self, table, months=None, columns=None, filters=None):
+        """Read ``table`` as a pyarrow Table.
+
+        ``months`` prunes partitions before any file is opened, ``columns``
+        limits decoding to the listed columns and ``filters`` (pyarrow DNF
+        filters) is pushed down to row-group statistics.
+        """
+        if not os.path.isdir(os.path.join(self.root, table)):
+            raise KeyError(f"Unknown table '{table}' in {self.root}")
+
+        if os.path.exists(self._path(table)):
+            paths = [self._path(table)]
+        else:
+            if months is None:
+                months = self.months(table)
+            paths = [self._path(table, month) for month in months]
+            paths = [path for path in paths if os.path.exists(path)]
+
+        if not paths:
+            schema = pq.read_schema(self._any_partition(table))
+            if columns is not None:
+                schema = pa.schema([schema.field(name) for name in columns])
+            return schema.empty_table()
+
+        # Without filters a plain file read skips read_table's per-call dataset setup
+        if filters is None:
+            parts = [pq.ParquetFile(path, memory_map=True).read(columns=columns) for path in paths]
+        else:
+            parts = [
+                pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+                for path in paths
+            ]
+        return pa.concat_tables(parts) if len(parts) > 1 else parts[0]
+
+    def read(self, table, months=None, columns=None, filters=None):
+        """Read ``table`` as a pandas DataFrame (see ``read_arrow``)."""
+        return self.read_arrow(table, months=months, columns=columns, filters=filters).to_pandas()
+
+    def iter_batches(self, table, month, columns=None, batch_size=500_000):
+        """Stream one partition as DataFrames of at most ``batch_size`` rows."""
+        parquet_file = pq.ParquetFile(self._path(table, month), memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+    def column_array(self, table, month, columns, batch_size=500_000):
+        """Memory-mapped (columns, rows) float32 copy of one partition.
+
+        The array is laid out column by column in ``columns.npy`` next to the
+        Parquet partition, so every column is one contiguous block that any
+        process can map read-only without copying or pickling it. It is
+        (re)built from Parquet when missing, stale or holding other columns.
+        """
+        part_path = self._path(table, month)
+        array_path = os.path.join(os.path.dirname(part_path), COLUMNS_FILE)
+        names_path = os.path.join(os.path.dirname(part_path), COLUMN_NAMES_FILE)
+
+        fresh = (os.path.exists(array_path) and os.path.exists(names_path)
+                 and os.path.getmtime(array_path) >= os.path.getmtime(part_path))
+        if fresh:
+            with open(names_path) as f:
+                fresh = json.load(f) == list(columns)
+        if not fresh:
+            n_rows = pq.ParquetFile(part_path).metadata.num_rows
+            tmp_path = array_path + '.tmp.npy'
+            array = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                              shape=(len(columns), n_rows))
+            start = 0
+            for batch in self.iter_batches(table, month, columns=list(columns), batch_size=batch_size):
+                array[:, start:start + len(batch)] = batch.to_numpy(dtype=np.float32, na_value=np.nan).T
+                start += len(batch)
+            array.flush()
+            del array
+            os.replace(tmp_path, array_path)
+            with open(names_path, 'w') as f:
+                json.dump(list(columns), f)
+        return array_path
+
+    def read_numpy(self, table, month, column):
+        """One column of one partition as a NumPy array, zero-copy where Arrow allows it."""
+        chunked = self.read_arrow(table, months=[month], columns=[column]).column(column)
+        if chunked.num_chunks == 1:
+            return chunked.chunk(0).to_numpy(zero_copy_only=False)
+        return chunked.to_numpy()
+
+    def _any_partition(self, table):
+        table_dir = os.path.join(self.root, table)
+        for name in sorted(os.listdir(table_dir)):
+            path = os.path.join(table_dir, name, PART_FILE)
+            if os.path.exists(path):
+                return path
+        raise KeyError(f"Table '{table}' has no partitions")
+
+    def drop_month(self, table, month):
+        """Remove one month partition of ``table``."""
+        shutil.rmtree(os.path.dirname(self._path(table, month)), ignore_errors=True)
+
+
+def write_mock_data(store, df, roc_data, prc_data, feature_importance, feature_drift):
+    """Persist the outputs of create_mock_data/create_mock_feature_data."""
+    store.write_by_month('decile_summary', df)
+    store.write_by_month('feature_importance', feature_importance)
+    store.write_by_month('feature_drift', feature_drift)
+
+    # Curves are not monthly in the mock data
+    store.write('roc', roc_data)
+    store.write('prc', prc_data)
+
+    store.mark_updated(store.months('decile_summary'))
+
+
+def write_synthetic_month(store, month):
+    """Persist one month from data.synthetic.generate_month.
+
+    Writes row-level ``scores`` (one row per model and customer),
+    ``conversions`` and ``features`` partitions plus the aggregated
+    ``decile_summary``, ``score_histograms`` and ``feature_importance``
+    partitions (importance is the generator's true signal share).
+    """
+    date = month['date']
+    n_models, n = month['score'].shape
+
+    scores = pd.DataFrame({
+        'model': np.repeat(np.arange(n_models, dtype=np.int8), n),
+        'customer_id': np.tile(month['customer_id'], n_models),
+        'segment': np.tile(month['segment'], n_models),
+        'score': month['score'].ravel(),
+        'decile': month['decile'].ravel(),
+        'bucket': pd.Categorical.from_codes(month['bucket'].ravel(), categories=BUCKETS),
+    })
+    store.write('scores', scores, month=date)
+
+    conversions = pd.DataFrame({
+        'customer_id': month['customer_id'],
+        'converted': month['converted'],
+    })
+    store.write('conversions', conversions, month=date)
+
+    names = feature_names(month['features'].shape[1])
+    features = pd.DataFrame(month['features'], columns=names)
+    features.insert(0, 'customer_id', month['customer_id'])
+    store.write('features', features, month=date)
+    store.write('feature_importance', pd.DataFrame({
+        'date': date,
+        'month': month['month'],
+        'Feature': names,
+        'Importance': month['importance'],
+    }), month=date)
+
+    store.write('decile_summary', aggregate_month(month), month=date)
+
+    n_segments = int(month['segment'].max()) + 1
+    histograms = pd.concat([
+        histogram_frame(build_histograms(month['score'][model], month['converted'],
+                                         month['segment'], n_segments=n_segments), model=model)
+        for model in range(n_models)
+    ], ignore_index=True)
+    store.write('score_histograms', histograms, month=date)
+
+
+def build_synthetic_store(root, **kwargs):
+    """Stream data.synthetic months into a fresh store at ``root``."""
+    store = ParquetStore(root)
+    for month in iter_synthetic_months(**kwargs):
+        write_synthetic_month(store, month)
+    store.mark_updated(store.months('decile_summary'))
+    return store
+
+
+def seed_mock_store(root):
+    """Write the mock data and its derived tables to the store at ``root`` unless it has data.
+
+    A separate step before serving, so app processes only ever read the
+    store and workers starting together do not race to write it.
+    """
+    store = ParquetStore(root)
+    if store.has_table('decile_summary'):
+        return store
+    # Mock data and the derived tables are only needed to seed a new store
+    from data.cube import build_cube
+    from data.mock_data import create_mock_data, create_mock_feature_data
+    from metrics.bootstrap import compute_intervals
+
+    # Set random seed for reproducibility
+    np.random.seed(42)
+    df, roc_data, prc_data = create_mock_data()
+    feature_importance, feature_drift = create_mock_feature_data()
+    write_mock_data(store, df, roc_data, prc_data, feature_importance, feature_drift)
+    build_cube(store)
+    compute_intervals(store)
+    return store
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build a synthetic month-partitioned store, or seed one with the mock data.')
+    parser.add_argument('root')
+    parser.add_argument('--mock', action='store_true',
+                        help='seed an empty store with the small mock dataset the dashboard ships with')
+    parser.add_argument('--customers', type=int, default=2_500_000)
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--models', type=int, default=1)
+    parser.add_argument('--features', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes for bootstrap and drift (default: one per core)')
+    args = parser.parse_args()
+    if args.mock:
+        seed_mock_store(args.root)
+    else:
+        from data.cube import build_cube
+        from metrics.bootstrap import compute_intervals
+        from metrics.drift import compute_feature_drift
+
+        store = build_synthetic_store(args.root, n_customers=args.customers, n_months=args.months,
+                                      n_models=args.models, n_features=args.features, seed=args.seed)
+        build_cube(store)
+        compute_intervals(store, processes=args.processes)
+        compute_feature_drift(store, processes=args.processes)
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from data.mock_data import FEATURES
+
+# Bucket codes used by the row-level arrays (index into BUCKETS)
+BUCKETS = ['Low', 'Medium', 'High']
+LOW, MEDIUM, HIGH = 0, 1, 2
+
+# Population share below which a customer is Low / Medium.
+# Matches create_mock_data: Low = deciles 1-4 and 80% of 5,
+# Medium = 20% of 5, deciles 6-7 and 30% of 8, High = the rest.
+LOW_CUTOFF = 0.48
+MEDIUM_CUTOFF = 0.73
+
+DEFAULT_END_MONTH = pd.Timestamp(2025, 4, 4)
+
+
+def synthetic_months(n_months, end=DEFAULT_END_MONTH):
+    """Scoring dates (4th of the month), oldest to newest."""
+    end = pd.Timestamp(end)
+    return [end - pd.DateOffset(months=i) for i in range(n_months - 1, -1, -1)]
+
+
+def feature_names(n_features):
+    """Column names for the synthetic feature matrix."""
+    extra = [f'Feature {i + 1}' for i in range(len(FEATURES), n_features)]
+    return (FEATURES + extra)[:n_features]
+
+
+def assign_deciles(scores):
+    """Decile (1 = lowest, 10 = highest) and bucket code for every score.
+
+    Works on the last axis, so a (n_models, n_customers) array is ranked
+    per model.
+    """
+    n = scores.shape[-1]
+    ranks = np.argsort(np.argsort(scores, axis=-1, kind='stable'), axis=-1)
+    deciles = (ranks * 10 // n + 1).astype(np.int8)
+    buckets = buckets_from_rank_share(ranks / n)
+    return deciles, buckets
+
+
+def buckets_from_rank_share(share):
+    """Bucket code from the share of the population scored below a customer."""
+    buckets = np.full(np.shape(share), LOW, dtype=np.int8)
+    buckets[share >= LOW_CUTOFF] = MEDIUM
+    buckets[share >= MEDIUM_CUTOFF] = HIGH
+    return buckets
+
+
+def generate_month(month_idx, date, n_customers=2_500_000, n_models=1,
+                   n_features=10, n_segments=4, seed=42, drift=0.02, missing_rate=0.01):
+    """Row-level scores, deciles, buckets, conversions and features for one month.
+
+    Each month draws from its own child of ``seed`` so the output for a given
+    (seed, month_idx) is identical no matter how many months are generated or
+    in which order.
+    """
+    rng = np.random.default_rng([seed, month_idx])
+
+    # Customer base fluctuates by ~2% month to month
+    n = int(n_customers + rng.integers(-n_customers // 50, n_customers // 50 + 1))
+
+    # Latent propensity drives both the scores and the outcome; segments
+    # (e.g. regions) shift the propensity a little
+    segment = rng.integers(0, n_segments, n, dtype=np.int8)
+    latent = rng.standard_normal(n, dtype=np.float32)
+    latent += np.linspace(-0.2, 0.2, n_segments, dtype=np.float32)[segment]
+
+    # Each model sees the latent signal plus its own noise (AUROC ~0.70)
+    noise = rng.standard_normal((n_models, n), dtype=np.float32)
+    logits = -3.6 + 1.2 * latent + 1.1 * noise + drift * month_idx
+    scores = (1.0 / (1.0 + np.exp(-logits))).astype(np.float32)
+    deciles, buckets = assign_deciles(scores)
+
+    # Outcomes are shared across models (overall conversion rate ~3%)
+    p_convert = 1.0 / (1.0 + np.exp(-(-4.1 + 1.2 * latent)))
+    converted = rng.random(n, dtype=np.float32) < p_convert
+
+    # Features: loadings on the latent signal, a slow monthly shift and some gaps
+    loadings = np.linspace(0.8, 0.05, n_features, dtype=np.float32)
+    shift = drift * month_idx * np.linspace(1.0, 5.0, n_features, dtype=np.float32)
+    features = rng.standard_normal((n, n_features), dtype=np.float32)
+    features += latent[:, None] * loadings + shift
+    if missing_rate:
+        features[rng.random((n, n_features), dtype=np.float32) < missing_rate] = np.nan
+
+    return {
+        'date': pd.Timestamp(date),
+        'month': pd.Timestamp(date).strftime('%b %Y'),
+        'customer_id': np.arange(n, dtype=np.int32),
+        'segment': segment,
+        'score': scores,
+        'decile': deciles,
+        'bucket': buckets,
+        'converted': converted,
+        'features': features,
+        'importance': loadings ** 2 / np.sum(loadings ** 2),
+    }
+
+
+def iter_synthetic_months(n_customers=2_500_000, n_months=24, n_models=1,
+                          n_features=10, seed=42, **kwargs):
+    """Yield one month of row-level data at a time, oldest first.
+
+    Peak memory is a single month, so 2.5M customers x 24 months can be
+    streamed into a store without materialising the whole history.
+    """
+    for month_idx, date in enumerate(synthetic_months(n_months)):
+        yield generate_month(month_idx, date, n_customers=n_customers,
+                             n_models=n_models, n_features=n_features,
+                             seed=seed, **kwargs)
+
+
+def create_synthetic_data(n_customers=2_500_000, n_months=24, n_models=1,
+                          n_features=10, seed=42, **kwargs):
+    """All months of row-level data as a list of per-month dicts."""
+    return list(iter_synthetic_months(n_customers=n_customers, n_months=n_months,
+                                      n_models=n_models, n_features=n_features,
+                                      seed=seed, **kwargs))
+
+
+def aggregate_month(month, model=0):
+    """Collapse one month of row-level data to the create_mock_data layout."""
+    deciles = month['decile'][model].astype(np.int64)
+    buckets = month['bucket'][model].astype(np.int64)
+
+    customers, conversions = count_decile_buckets(deciles, buckets, month['converted'])
+    return summary_frame(month['date'], customers, conversions)
+
+
+def count_decile_buckets(deciles, buckets, converted=None):
+    """(10, 3) customer and conversion counts from one bincount over the (decile, bucket) key."""
+    key = (np.asarray(deciles, dtype=np.int64) - 1) * len(BUCKETS) + np.asarray(buckets, dtype=np.int64)
+    size = 10 * len(BUCKETS)
+    customers = np.bincount(key, minlength=size)
+    if converted is None:
+        conversions = np.zeros(size)
+    else:
+        conversions = np.bincount(key, weights=converted, minlength=size)
+    shape = (10, len(BUCKETS))
+    return customers.reshape(shape), conversions.astype(np.int64).reshape(shape)
+
+
+def summary_frame(date, customers, conversions, month=None):
+    """Decile summary rows (create_mock_data layout) for one month of (10, 3) counts.
+
+    ``date`` is the run date stamped on the rows; the month label is taken
+    from ``month`` when given, else from ``date``.
+    """
+    date = pd.Timestamp(date)
+    month = date if month is None else pd.Timestamp(month)
+    decile_idx, bucket_idx = np.nonzero(customers)
+    return pd.DataFrame({
+        'date': date,
+        'month': month.strftime('%b %Y'),
+        'decile': decile_idx + 1,
+        'bucket': np.array(BUCKETS)[bucket_idx],
+        'customers': customers[decile_idx, bucket_idx],
+        'conversions': conversions[decile_idx, bucket_idx],
+    })
+
+
+def create_synthetic_frame(model=0, **kwargs):
+    """Aggregate synthetic data into the same frame create_mock_data returns."""
+    return pd.concat(
+        [aggregate_month(month, model=model) for month in iter_synthetic_months(**kwargs)],
+        ignore_index=True
+    )
@@ -1,8 +1,10 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 
+from components.scorecard import scorecard
 
-def section1_stability_analysis():
+
+def section1_stability_analysis(figures, scorecards):
     """
     Section 1: Stability Analysis
     ------------------------------
@@ -23,92 +25,29 @@ def section1_stability_analysis():
             ])
         ]),
         
-        # Scorecards
+        # Scorecards, filled in for the selected month by the KPI engine (metrics/kpis.py)
         dbc.Row([
             # Last model run date
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Last Model Run Date", className="card-title"),
-                        html.H3("April 4, 2025", className="card-text text-center my-3"),
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            
-            # Number of customers scored
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Customers Scored", className="card-title"),
-                        html.Div([
-                            html.H3("2.58M", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-up text-success"),
-                                " +3%"
-                            ], className="text-success")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
+            scorecard("Last Model Run Date", 'kpi-run-date', scorecards.get('kpi-run-date')),
 
+            # Number of customers scored
+            scorecard("Customers Scored", 'kpi-customers', scorecards.get('kpi-customers')),
         ]),
-        
+
         dbc.Row([
-            # High probability customers
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("High Probability Customers", className="card-title"),
-                        html.Div([
-                            html.H3("25%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-up text-success"),
-                                " +2%"
-                            ], className="text-success")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            # Medium probability customers
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Medium Probability Customers", className="card-title"),
-                        html.Div([
-                            html.H3("35%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-down text-danger"),
-                                " -1%"
-                            ], className="text-danger")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            
-            # Low probability customers
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Low Probability Customers", className="card-title"),
-                        html.Div([
-                            html.H3("40%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-down text-danger"),
-                                " -1%"
-                            ], className="text-danger")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            
+            # Share of customers per probability bucket
+            scorecard("High Probability Customers", 'kpi-share-high', scorecards.get('kpi-share-high')),
+            scorecard("Medium Probability Customers", 'kpi-share-medium', scorecards.get('kpi-share-medium')),
+            scorecard("Low Probability Customers", 'kpi-share-low', scorecards.get('kpi-share-low')),
         ]),
-        
+
         # Charts for Section 1
         dbc.Row([
             # Total customers over time
             dbc.Col([
                 dcc.Graph(
                     id='total-customers-chart',
+                    figure=figures['total-customers-chart'],
                     config={'displayModeBar': True, 'displaylogo': False, 'toImageButtonOptions': {'format': 'png', 'filename': 'total_customers_chart'}}
                 )
             ], width=12, className="mb-4"),
@@ -119,6 +58,7 @@ def section1_stability_analysis():
             dbc.Col([
                 dcc.Graph(
                     id='stacked-customers-chart',
+                    figure=figures['stacked-customers-chart'],
                     config={'displayModeBar': True, 'displaylogo': False, 'toImageButtonOptions': {'format': 'png', 'filename': 'stacked_customers_chart'}}
                 )
             ], width=12, className="mb-4"),
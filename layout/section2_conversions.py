@@ -1,8 +1,10 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 
+from components.scorecard import scorecard
 
-def section2_conversion_analysis():
+
+def section2_conversion_analysis(figures, scorecards):
     """
     Section 2: Conversion Analysis
     ------------------------------
@@ -23,55 +25,14 @@ def section2_conversion_analysis():
             ])
         ]),
         
-        # Conversion rate scorecards
+        # Conversion rate scorecards, filled in for the selected month by the KPI engine
         dbc.Row([
-            # High bucket conversion rate
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("High Bucket Conversion Rate", className="card-title"),
-                        html.Div([
-                            html.H3("7.0%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-up text-success"),
-                                " +0.5%"
-                            ], className="text-success")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            
-            # Medium bucket conversion rate
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Medium Bucket Conversion Rate", className="card-title"),
-                        html.Div([
-                            html.H3("4.0%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-up text-success"),
-                                " +0.3%"
-                            ], className="text-success")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
-            
-            # Low bucket conversion rate
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5("Low Bucket Conversion Rate", className="card-title"),
-                        html.Div([
-                            html.H3("1.5%", className="card-text text-center d-inline-block me-2"),
-                            html.Span([
-                                html.I(className="fas fa-arrow-down text-danger"),
-                                " -0.1%"
-                            ], className="text-danger")
-                        ], className="text-center my-3")
-                    ])
-                ], className="mb-4")
-            ], width=4),
+            scorecard("High Bucket Conversion Rate", 'kpi-conversion-rate-high',
+                      scorecards.get('kpi-conversion-rate-high')),
+            scorecard("Medium Bucket Conversion Rate", 'kpi-conversion-rate-medium',
+                      scorecards.get('kpi-conversion-rate-medium')),
+            scorecard("Low Bucket Conversion Rate", 'kpi-conversion-rate-low',
+                      scorecards.get('kpi-conversion-rate-low')),
         ]),
         
         # Charts for Section 2
@@ -91,6 +52,7 @@ def section2_conversion_analysis():
             dbc.Col([
                 dcc.Graph(
                     id='stacked-decile-conversion-chart',
+                    figure=figures['stacked-decile-conversion-chart'],
                     config={'displayModeBar': True, 'displaylogo': False, 'toImageButtonOptions': {'format': 'png', 'filename': 'stacked_decile_conversion_chart'}}
                 )
             ], width=12, className="mb-4"),
@@ -101,6 +63,7 @@ def section2_conversion_analysis():
             dbc.Col([
                 dcc.Graph(
                     id='total-conversions-chart',
+                    figure=figures['total-conversions-chart'],
                     config={'displayModeBar': True, 'displaylogo': False, 'toImageButtonOptions': {'format': 'png', 'filename': 'total_conversions_chart'}}
                 )
             ], width=12, className="mb-4"),
@@ -17,6 +17,10 @@ def section3_offline_metrics():
                 html.P("This section provides technical metrics that help assess the model's accuracy and performance. These metrics are standard in the data science community and help us understand how well our model discriminates between customers who will convert and those who won't.", className="mb-4")
             ])
         ]),
+
+        # Progress of the section's background job; only shown while it runs
+        dbc.Progress(id='section3-progress', value=0, striped=True, animated=True,
+                     style={'visibility': 'hidden'}, className="mb-3"),
         
         # ROC and PRC curves
         dbc.Row([
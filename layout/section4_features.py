@@ -1,6 +1,9 @@
 from dash import dcc, html, dash_table
+from dash.dash_table.Format import Format, Scheme
 import dash_bootstrap_components as dbc
 
+DRIFT_FORMAT = Format(precision=3, scheme=Scheme.fixed)
+
 
 def section4_feature_analysis():
     """
@@ -17,6 +20,10 @@ def section4_feature_analysis():
                 html.P("This section highlights which features are most important for our model's predictions and monitors if these features are stable over time. Feature drift can indicate changing customer behavior or data quality issues that might affect model performance.", className="mb-4")
             ])
         ]),
+
+        # Progress of the section's background job; only shown while it runs
+        dbc.Progress(id='section4-progress', value=0, striped=True, animated=True,
+                     style={'visibility': 'hidden'}, className="mb-3"),
         
         # Feature importance chart
         dbc.Row([
@@ -36,7 +43,12 @@ def section4_feature_analysis():
                     id='feature-drift-table',
                     columns=[
                         {'name': 'Feature', 'id': 'Feature'},
-                        {'name': 'CSI', 'id': 'CSI'},
+                        {'name': 'CSI', 'id': 'CSI', 'type': 'numeric', 'format': DRIFT_FORMAT},
+                        {'name': 'KS', 'id': 'KS', 'type': 'numeric', 'format': DRIFT_FORMAT},
+                        {'name': 'JS', 'id': 'JS', 'type': 'numeric', 'format': DRIFT_FORMAT},
+                        {'name': 'Wasserstein', 'id': 'Wasserstein', 'type': 'numeric', 'format': DRIFT_FORMAT},
+                        {'name': 'Missing Rate Change', 'id': 'Missing Rate Change', 'type': 'numeric',
+                         'format': DRIFT_FORMAT},
                         {'name': 'Status', 'id': 'Status'}
                     ],
                     style_table={'overflowX': 'auto'},
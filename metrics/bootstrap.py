@@ -0,0 +1,159 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data.cube import load_cube
+from data.snapshot import load_snapshot
+from data.store import to_month
+from data.synthetic import BUCKETS
+from metrics.histograms import has_histograms, histogram_summaries, load_histograms
+
+N_REPLICATES = 1000
+CONFIDENCE = 0.95
+INTERVALS_TABLE = 'confidence_intervals'
+INTERVAL_COLUMNS = ['metric', 'group', 'estimate', 'lower', 'upper']
+
+
+def poisson_rate_replicates(customers, conversions, n_replicates, rng):
+    """Bootstrap replicates of conversions / customers from aggregated counts.
+
+    Resampling customers with Poisson(1) weights means a cell of ``c``
+    customers and ``k`` conversions resamples to Poisson(k) conversions and
+    Poisson(c - k) non-conversions, so no row-level data is needed. Inputs
+    are (..., cells) counts; the result is (n_replicates, ...) rates summed
+    over the last axis.
+    """
+    customers = np.asarray(customers, dtype=np.float64)
+    conversions = np.asarray(conversions, dtype=np.float64)
+    size = (n_replicates,) + customers.shape
+    converted = rng.poisson(conversions, size=size).sum(axis=-1)
+    not_converted = rng.poisson(customers - conversions, size=size).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return converted / (converted + not_converted)
+
+
+def _interval_rows(metric, groups, estimates, replicates, confidence):
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({
+        'metric': metric,
+        'group': groups,
+        'estimate': np.atleast_1d(estimates),
+        'lower': np.atleast_1d(lower),
+        'upper': np.atleast_1d(upper),
+    })
+
+
+def month_intervals(task):
+    """Confidence intervals for one month; runs in a worker process.
+
+    ``task`` holds plain arrays only: the month's (10, 3) customer and
+    conversion counts, the previous month's (or None), the month's and the
+    previous month's positive/negative score histograms (or None) and a seed.
+    """
+    (customers, conversions, previous, histograms, previous_histograms,
+     seed, n_replicates, confidence) = task
+    rng = np.random.default_rng(seed)
+    frames = []
+
+    # Bucket conversion rates: cells are the deciles within each bucket
+    bucket_customers = customers.T
+    bucket_conversions = conversions.T
+    bucket_rates = poisson_rate_replicates(bucket_customers, bucket_conversions, n_replicates, rng)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bucket_estimate = bucket_conversions.sum(axis=1) / bucket_customers.sum(axis=1)
+    frames.append(_interval_rows('conversion_rate', BUCKETS, bucket_estimate, bucket_rates, confidence))
+
+    # Month-on-month change in bucket conversion rate from independent replicates
+    if previous is not None:
+        prev_customers, prev_conversions = previous
+        prev_rates = poisson_rate_replicates(prev_customers.T, prev_conversions.T, n_replicates, rng)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prev_estimate = prev_conversions.sum(axis=0) / prev_customers.sum(axis=0)
+        frames.append(_interval_rows('conversion_rate_change', BUCKETS, bucket_estimate - prev_estimate,
+                                     bucket_rates - prev_rates, confidence))
+
+    # Decile conversion rates: cells are the buckets within each decile
+    decile_rates = poisson_rate_replicates(customers, conversions, n_replicates, rng)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decile_estimate = conversions.sum(axis=1) / customers.sum(axis=1)
+    frames.append(_interval_rows('decile_conversion_rate', [str(d) for d in range(1, 11)],
+                                 decile_estimate, decile_rates, confidence))
+
+    # AUROC and average precision from Poisson-resampled score histograms
+    if histograms is not None:
+        positives, negatives = histograms
+        auroc, average_precision = histogram_summaries(positives, negatives)
+        boot_pos = rng.poisson(positives, size=(n_replicates, positives.size))
+        boot_neg = rng.poisson(negatives, size=(n_replicates, negatives.size))
+        boot_auroc, boot_ap = histogram_summaries(boot_pos, boot_neg)
+        frames.append(_interval_rows('auroc', ['All'], auroc, boot_auroc[:, None], confidence))
+        frames.append(_interval_rows('average_precision', ['All'], average_precision,
+                                     boot_ap[:, None], confidence))
+
+        # Month-on-month AUROC change, resampling both months independently
+        if previous_histograms is not None:
+            prev_positives, prev_negatives = previous_histograms
+            prev_auroc, _ = histogram_summaries(prev_positives, prev_negatives)
+            prev_boot_auroc, _ = histogram_summaries(
+                rng.poisson(prev_positives, size=(n_replicates, prev_positives.size)),
+                rng.poisson(prev_negatives, size=(n_replicates, prev_negatives.size)))
+            frames.append(_interval_rows('auroc_change', ['All'], auroc - prev_auroc,
+                                         (boot_auroc - prev_boot_auroc)[:, None], confidence))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def compute_intervals(store, months=None, processes=None, n_replicates=N_REPLICATES,
+                      confidence=CONFIDENCE, seed=0, cube=None):
+    """Bootstrap intervals for ``months`` (default: all), spread over a process pool.
+
+    Each month is one task; results are written to the ``confidence_intervals``
+    table so every worker process and later request reuses them. Counts come
+    from ``cube``, by default the store's published cube; an ingest passes the
+    cube it has just written, before the new version is published.
+    """
+    cube = load_cube(store) if cube is None else cube
+    months = cube.months if months is None else [to_month(month) for month in months]
+
+    tasks = []
+    for month in months:
+        idx = cube.month_index(month)
+        previous, previous_histograms = None, None
+        if idx > 0:
+            previous = (cube.customers[idx - 1], cube.conversions[idx - 1])
+            previous_month = cube.months[idx - 1]
+            if has_histograms(store, previous_month):
+                previous_histograms = load_histograms(store, [previous_month])
+        histograms = load_histograms(store, [month]) if has_histograms(store, month) else None
+        month_seed = [seed, month.year, month.month]
+        tasks.append((cube.customers[idx], cube.conversions[idx], previous, histograms,
+                      previous_histograms, month_seed, n_replicates, confidence))
+
+    if processes != 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(month_intervals, tasks))
+    else:
+        results = [month_intervals(task) for task in tasks]
+
+    for month, frame in zip(months, results):
+        store.write(INTERVALS_TABLE, frame, month=month)
+    return dict(zip(months, results))
+
+
+def load_intervals(store, month):
+    """Intervals for one month as of the current snapshot (empty frame if none were computed)."""
+    snapshot = load_snapshot(store)
+    if not snapshot.has_month(INTERVALS_TABLE, month):
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+    return snapshot.month_index(INTERVALS_TABLE).get(month)
+
+
+def interval(store, month, metric, group='All'):
+    """(estimate, lower, upper) for one metric and group, or None."""
+    frame = load_intervals(store, month)
+    row = frame[(frame['metric'] == metric) & (frame['group'] == group)]
+    if row.empty:
+        return None
+    return tuple(row[['estimate', 'lower', 'upper']].iloc[0])
@@ -0,0 +1,44 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Cumulative metrics per cube; a refreshed store yields a new cube, so entries
+# go away with the cube they were computed from
+_cumulative_cache = weakref.WeakKeyDictionary()
+
+
+def cumulative_by_decile(cube):
+    """Cumulative recall and precision when targeting the top 1..10 deciles, for every month.
+
+    One reverse cumulative sum over the decile axis of the (months, 10)
+    customer and conversion totals covers all months at once. Returns
+    ``(recall, precision)``, each (months, 10), where column ``i`` is the
+    value after targeting the ``i + 1`` highest-propensity deciles.
+    """
+    cached = _cumulative_cache.get(cube)
+    if cached is not None:
+        return cached
+
+    customers = cube.total('customers', by=('month', 'decile'))[:, ::-1]
+    conversions = cube.total('conversions', by=('month', 'decile'))[:, ::-1]
+    cum_customers = np.cumsum(customers, axis=1)
+    cum_conversions = np.cumsum(conversions, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recall = cum_conversions / cum_conversions[:, -1:]
+        precision = cum_conversions / cum_customers
+    result = (np.nan_to_num(recall), np.nan_to_num(precision))
+    _cumulative_cache[cube] = result
+    return result
+
+
+def cumulative_metrics_frame(cube, month):
+    """Cumulative metrics for one month, in the layout the section 3 charts plot."""
+    recall, precision = cumulative_by_decile(cube)
+    idx = cube.month_index(month)
+    return pd.DataFrame({
+        'Decile': np.arange(1, 11),
+        'Cumulative Recall': recall[idx],
+        'Cumulative Precision': precision[idx],
+    })
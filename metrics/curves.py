@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from data.snapshot import load_snapshot
+from data.store import to_month
+
+DEFAULT_CURVE_POINTS = 300
+
+# Curves per (store root, month), tagged with the month's version in the store snapshot
+_curve_cache = {}
+
+
+def roc_pr_curves(scores, labels):
+    """Exact ROC and precision-recall curves from one descending sort and cumsum.
+
+    Returns a dict with ``fpr``/``tpr`` (ROC), ``recall``/``precision`` (PR),
+    ``thresholds`` and the ``auroc`` and ``average_precision`` summaries.
+    Tied scores collapse into a single threshold.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+
+    order = np.argsort(scores, kind='stable')[::-1]
+    scores = scores[order]
+    labels = labels[order]
+
+    # Last index of each run of equal scores is one operating point
+    distinct = np.flatnonzero(np.diff(scores)) if scores.size else np.empty(0, dtype=np.int64)
+    ends = np.append(distinct, scores.size - 1)
+
+    tps = np.cumsum(labels)[ends].astype(np.float64)
+    fps = (ends + 1) - tps
+    positives, negatives = tps[-1], fps[-1]
+
+    tpr = np.concatenate([[0.0], tps / positives])
+    fpr = np.concatenate([[0.0], fps / negatives])
+    recall = tps / positives
+    precision = tps / (tps + fps)
+
+    return {
+        'fpr': fpr,
+        'tpr': tpr,
+        'recall': np.concatenate([[0.0], recall]),
+        'precision': np.concatenate([[precision[0]], precision]),
+        'thresholds': scores[ends],
+        'auroc': float(np.trapezoid(tpr, fpr)),
+        'average_precision': float(np.sum(np.diff(np.concatenate([[0.0], recall])) * precision)),
+        'positives': int(positives),
+        'negatives': int(negatives),
+    }
+
+
+def downsample_curve(x, y, n_points=DEFAULT_CURVE_POINTS):
+    """Indices of at most ``n_points`` points spaced evenly along the curve's arc length.
+
+    Both axes are on [0, 1], so equal arc-length spacing puts points where
+    the curve bends or moves fastest and keeps its shape, while the two
+    end points are always kept.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.size <= n_points:
+        return np.arange(x.size)
+
+    arc = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+    targets = np.linspace(0.0, arc[-1], n_points)
+    idx = np.searchsorted(arc, targets, side='left')
+    return np.unique(np.clip(np.concatenate([[0], idx, [x.size - 1]]), 0, x.size - 1))
+
+
+def downsample_curves(curves, n_points=DEFAULT_CURVE_POINTS):
+    """ROC and PR curve frames with at most ``n_points`` points each, plus the summaries."""
+    roc_idx = downsample_curve(curves['fpr'], curves['tpr'], n_points)
+    pr_idx = downsample_curve(curves['recall'], curves['precision'], n_points)
+    return {
+        'roc': pd.DataFrame({'FPR': curves['fpr'][roc_idx], 'TPR': curves['tpr'][roc_idx]}),
+        'prc': pd.DataFrame({'Recall': curves['recall'][pr_idx],
+                             'Precision': curves['precision'][pr_idx]}),
+        'auroc': curves['auroc'],
+        'average_precision': curves['average_precision'],
+    }
+
+
+def read_scored_outcomes(store, month, model=0):
+    """Scores and conversion flags for one month, aligned on customer_id."""
+    scores = store.read('scores', months=[month], columns=['customer_id', 'score'],
+                        filters=[('model', '=', model)])
+    outcomes = store.read('conversions', months=[month], columns=['customer_id', 'converted'])
+
+    # Both partitions are written in customer order; fall back to a join otherwise
+    if np.array_equal(scores['customer_id'].to_numpy(), outcomes['customer_id'].to_numpy()):
+        return scores['score'].to_numpy(), outcomes['converted'].to_numpy()
+    joined = scores.merge(outcomes, on='customer_id', how='inner')
+    return joined['score'].to_numpy(), joined['converted'].to_numpy()
+
+
+def has_row_level_data(store, month):
+    snapshot = load_snapshot(store)
+    return snapshot.has_month('scores', month) and snapshot.has_month('conversions', month)
+
+
+def month_curves(store, month, model=0, n_points=DEFAULT_CURVE_POINTS):
+    """Downsampled ROC/PR curves, AUROC and average precision for one month.
+
+    Computed once per month and model and reused until that month is
+    rewritten in the store.
+    """
+    month = to_month(month)
+    month_version = load_snapshot(store).month_version(month)
+    key = (store.root, month, model, n_points)
+    cached = _curve_cache.get(key)
+    if cached is not None and cached[0] == month_version:
+        return cached[1]
+
+    scores, labels = read_scored_outcomes(store, month, model=model)
+    result = downsample_curves(roc_pr_curves(scores, labels), n_points=n_points)
+    _curve_cache[key] = (month_version, result)
+    return result
@@ -0,0 +1,217 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data.sketches import KLLSketch
+from data.store import to_month
+from metrics.feature_sketches import drift_status, load_feature_sketches, sketch_drift
+
+DRIFT_BINS = 10
+WARNING_CSI = 0.2
+EPSILON = 1e-4
+DEFAULT_CHUNK_SIZE = 250_000
+BASELINE_FILE = 'drift_baseline.npz'
+# Columns of the section 4 drift table; stores built from aggregates only have CSI and Status
+DRIFT_COLUMNS = ('Feature', 'CSI', 'KS', 'JS', 'Wasserstein', 'Missing Rate Change', 'Status')
+
+# Loaded baselines per store root, tagged with the file's modification time
+_baselines = {}
+
+
+def baseline_edges(chunks, n_bins=DRIFT_BINS, k=1000):
+    """Per-feature quantile bin edges, shape (features, n_bins - 1), from chunked baseline data.
+
+    Each feature gets a KLL sketch, so memory stays flat however many
+    baseline rows are streamed in.
+    """
+    sketches = None
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if sketches is None:
+            sketches = [KLLSketch(k=k, seed=i) for i in range(chunk.shape[1])]
+        for feature, sketch in enumerate(sketches):
+            sketch.update(chunk[:, feature])
+
+    qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+    return np.array([sketch.quantiles(qs) for sketch in sketches])
+
+
+def bin_features(matrix, edges):
+    """Bin index of every value of an (rows, features) matrix against per-feature edges.
+
+    One comparison per edge over the whole matrix bins every feature at
+    once. NaNs go to an extra last bin (index n_bins) so missing values count
+    towards drift too.
+    """
+    matrix = np.asarray(matrix)
+    codes = np.zeros(matrix.shape, dtype=np.int8)
+    for j in range(edges.shape[1]):
+        codes += matrix >= edges[:, j]
+    codes[np.isnan(matrix)] = edges.shape[1] + 1
+    return codes
+
+
+def bin_counts(matrix, edges):
+    """(features, n_bins + 1) counts per bin, the last column being missing values."""
+    codes = bin_features(matrix, edges)
+    n_features, width = codes.shape[1], edges.shape[1] + 2
+    key = codes.astype(np.int64) + np.arange(n_features) * width
+    return np.bincount(key.ravel(), minlength=n_features * width).reshape(n_features, width)
+
+
+def chunked_bin_counts(chunks, edges):
+    """Sum bin counts over an iterable of (rows, features) chunks."""
+    total = np.zeros((edges.shape[0], edges.shape[1] + 2), dtype=np.int64)
+    for chunk in chunks:
+        total += bin_counts(chunk, edges)
+    return total
+
+
+def stability_index(actual_counts, expected_counts):
+    """PSI / CSI per row: sum((a - e) * ln(a / e)) over bin shares.
+
+    Empty bins are floored at EPSILON so a bin that appears or disappears
+    gives a large but finite contribution.
+    """
+    actual = np.asarray(actual_counts, dtype=np.float64)
+    expected = np.asarray(expected_counts, dtype=np.float64)
+    actual = np.maximum(actual / actual.sum(axis=-1, keepdims=True), EPSILON)
+    expected = np.maximum(expected / expected.sum(axis=-1, keepdims=True), EPSILON)
+    return np.sum((actual - expected) * np.log(actual / expected), axis=-1)
+
+
+def drift_frame(features, csi):
+    """Rows for the feature drift table."""
+    csi = np.asarray(csi)
+    return pd.DataFrame({
+        'Feature': list(features),
+        'CSI': csi,
+        'Status': np.where(csi > WARNING_CSI, 'Warning', 'Stable'),
+    })
+
+
+def _feature_chunks(store, month, features, chunk_size):
+    for batch in store.iter_batches('features', month, columns=features, batch_size=chunk_size):
+        yield batch.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def feature_columns(store):
+    """Feature column names in the ``features`` table."""
+    months = store.months('features')
+    columns = store.read_arrow('features', months=months[:1]).column_names
+    return [column for column in columns if column not in ('customer_id', 'month')]
+
+
+def build_baseline(store, baseline_months=None, n_bins=DRIFT_BINS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compute and persist the drift baseline: bin edges and bin counts per feature.
+
+    The baseline defaults to the earliest month in the ``features`` table.
+    """
+    if baseline_months is None:
+        baseline_months = store.months('features')[:1]
+    baseline_months = [to_month(month) for month in baseline_months]
+    features = feature_columns(store)
+
+    def baseline_chunks():
+        for month in baseline_months:
+            yield from _feature_chunks(store, month, features, chunk_size)
+
+    edges = baseline_edges(baseline_chunks(), n_bins=n_bins)
+    counts = chunked_bin_counts(baseline_chunks(), edges)
+
+    path = os.path.join(store.root, BASELINE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, features=np.array(features), edges=edges, counts=counts,
+                 months=np.array(baseline_months, dtype='datetime64[ns]'))
+    os.replace(tmp_path, path)
+    _baselines.pop(store.root, None)
+    return load_baseline(store)
+
+
+def load_baseline(store):
+    """The persisted baseline as a dict of features, edges, counts and months (or None)."""
+    path = os.path.join(store.root, BASELINE_FILE)
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    loaded = _baselines.get(store.root)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+    with np.load(path) as arrays:
+        baseline = {
+            'features': list(arrays['features']),
+            'edges': arrays['edges'],
+            'counts': arrays['counts'],
+            'months': list(pd.to_datetime(arrays['months'])),
+        }
+    _baselines[store.root] = (mtime, baseline)
+    return baseline
+
+
+def _column_block_counts(task):
+    """Bin counts for a block of features; runs in a worker process.
+
+    The worker maps the column array itself, so only the path, the feature
+    range and that range's edges cross the process boundary.
+    """
+    array_path, start, stop, edges, chunk_size = task
+    columns = np.load(array_path, mmap_mode='r')
+    n_rows = columns.shape[1]
+    return chunked_bin_counts(
+        (columns[start:stop, row:row + chunk_size].T for row in range(0, n_rows, chunk_size)),
+        edges
+    )
+
+
+def parallel_bin_counts(array_path, edges, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Bin counts of a memory-mapped (features, rows) array, features split across processes."""
+    processes = processes or os.cpu_count()
+    n_features = edges.shape[0]
+    bounds = np.linspace(0, n_features, min(processes, n_features) + 1).astype(int)
+    tasks = [(array_path, start, stop, edges[start:stop], chunk_size)
+             for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+        return np.concatenate(list(pool.map(_column_block_counts, tasks)))
+
+
+def month_feature_drift(store, month, baseline=None, chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """CSI per feature for one month against the baseline.
+
+    With more than one process (default: one per core) the month's features
+    are laid out as a memory-mapped column array and split across a process
+    pool; otherwise the Parquet partition is streamed in chunks in this process.
+    """
+    if baseline is None:
+        baseline = load_baseline(store) or build_baseline(store)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes > 1:
+        array_path = store.column_array('features', month, baseline['features'], batch_size=chunk_size)
+        counts = parallel_bin_counts(array_path, baseline['edges'], processes=processes,
+                                     chunk_size=chunk_size)
+    else:
+        counts = chunked_bin_counts(_feature_chunks(store, month, baseline['features'], chunk_size),
+                                    baseline['edges'])
+    return drift_frame(baseline['features'], stability_index(counts, baseline['counts']))
+
+
+def compute_feature_drift(store, months=None, chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """Write ``feature_drift`` partitions (the section 4 drift table) for ``months``.
+
+    Besides CSI, each row carries KS, JS divergence, Wasserstein distance and
+    missing-rate change from the per-feature sketches, and Status flags any
+    statistic past its threshold.
+    """
+    baseline = load_baseline(store) or build_baseline(store)
+    months = store.months('features') if months is None else [to_month(month) for month in months]
+    expected = load_feature_sketches(store, baseline['months'], baseline['features'])
+    for month in months:
+        drift = month_feature_drift(store, month, baseline, chunk_size, processes=processes)
+        actual = load_feature_sketches(store, [month], baseline['features'])
+        drift = drift.drop(columns='Status').merge(sketch_drift(actual, expected), on='Feature')
+        drift['Status'] = drift_status(drift)
+        store.write('feature_drift', drift, month=month)
+    return months
@@ -0,0 +1,209 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.sketches import KLLSketch
+from data.store import to_month
+
+SKETCH_TABLE = 'feature_sketches'
+EDGES_FILE = 'feature_sketch_edges.npz'
+N_FINE_BINS = 64
+SKETCH_K = 400
+N_QUANTILES = 512
+
+# A feature is flagged when any statistic passes its threshold
+DRIFT_THRESHOLDS = {
+    'CSI': 0.2,
+    'KS': 0.1,
+    'JS': 0.1,
+    'Missing Rate Change': 0.05,
+}
+
+
+def fine_edges(chunk):
+    """Fixed per-feature histogram edges, (features, N_FINE_BINS + 1), from a first chunk.
+
+    Edges span the 0.1%-99.9% range of the chunk; values outside land in
+    the end bins. They are fixed once for the store so histograms of any
+    months add up.
+    """
+    lo, hi = np.nanquantile(chunk, [0.001, 0.999], axis=0)
+    hi = np.where(hi > lo, hi, lo + 1.0)
+    return lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, N_FINE_BINS + 1)
+
+
+def load_fine_edges(store, first_chunk=None):
+    """The store's fixed histogram edges, created from ``first_chunk`` on first use."""
+    path = os.path.join(store.root, EDGES_FILE)
+    if os.path.exists(path):
+        with np.load(path) as arrays:
+            return arrays['edges']
+    edges = fine_edges(first_chunk)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, edges=edges)
+    os.replace(tmp_path, path)
+    return edges
+
+
+def fine_counts(chunk, edges):
+    """(features, N_FINE_BINS + 1) counts; the last column counts missing values."""
+    n_rows, n_features = chunk.shape
+    codes = np.empty(chunk.shape, dtype=np.int64)
+    for feature in range(n_features):
+        inner = edges[feature, 1:-1]
+        codes[:, feature] = np.searchsorted(inner, chunk[:, feature], side='right')
+    codes[np.isnan(chunk)] = N_FINE_BINS
+    key = codes + np.arange(n_features) * (N_FINE_BINS + 1)
+    return np.bincount(key.ravel(), minlength=n_features * (N_FINE_BINS + 1)).reshape(n_features, -1)
+
+
+class FeatureSketches:
+    """Per-feature binned counts (with a missing bin) plus a KLL quantile sketch.
+
+    Sketches of separate chunks or months merge with ``merge``, so any
+    comparison window is built without touching the raw rows.
+    """
+
+    def __init__(self, features, counts, quantile_sketches):
+        self.features = list(features)
+        self.counts = counts
+        self.quantile_sketches = quantile_sketches
+
+    @classmethod
+    def from_chunks(cls, features, chunks, edges_for):
+        counts = None
+        quantile_sketches = [KLLSketch(k=SKETCH_K, seed=i) for i in range(len(features))]
+        for chunk in chunks:
+            edges = edges_for(chunk)
+            chunk_counts = fine_counts(chunk, edges)
+            counts = chunk_counts if counts is None else counts + chunk_counts
+            for feature, sketch in enumerate(quantile_sketches):
+                sketch.update(chunk[:, feature])
+        return cls(features, counts, quantile_sketches)
+
+    def merge(self, other):
+        self.counts = self.counts + other.counts
+        for mine, theirs in zip(self.quantile_sketches, other.quantile_sketches):
+            mine.merge(theirs)
+        return self
+
+    def to_frame(self):
+        """Long rows stored in the ``feature_sketches`` table."""
+        frames = []
+        for feature, name in enumerate(self.features):
+            levels, n, min_value, max_value = self.quantile_sketches[feature].to_levels()
+            level_idx = np.concatenate([np.full(items.size, level) for level, items in enumerate(levels)])
+            frames.append(pd.DataFrame({
+                'Feature': name,
+                'kind': np.concatenate([
+                    np.full(N_FINE_BINS + 1, 'bin'), np.full(level_idx.size, 'kll'),
+                    ['n', 'min', 'max', 'levels']
+                ]),
+                'index': np.concatenate([
+                    np.arange(N_FINE_BINS + 1), level_idx, [0, 0, 0, 0]
+                ]).astype(np.int32),
+                'value': np.concatenate([
+                    self.counts[feature].astype(np.float64), np.concatenate(levels),
+                    [n, min_value, max_value, len(levels)]
+                ]),
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def from_frame(cls, frame, features):
+        counts = np.zeros((len(features), N_FINE_BINS + 1), dtype=np.int64)
+        quantile_sketches = []
+        groups = dict(tuple(frame.groupby('Feature', sort=False)))
+        for feature, name in enumerate(features):
+            rows = groups[name]
+            bins = rows[rows['kind'] == 'bin']
+            counts[feature, bins['index'].to_numpy()] = bins['value'].to_numpy()
+            scalars = rows[rows['kind'].isin(['n', 'min', 'max', 'levels'])].set_index('kind')['value']
+            items = rows[rows['kind'] == 'kll']
+            levels = [items.loc[items['index'] == level, 'value'].to_numpy()
+                      for level in range(int(scalars['levels']))]
+            quantile_sketches.append(KLLSketch.from_levels(levels, scalars['n'], scalars['min'],
+                                                           scalars['max'], k=SKETCH_K, seed=feature))
+        return cls(features, counts, quantile_sketches)
+
+
+def build_feature_sketches(store, month, features, chunk_size=250_000):
+    """Sketch one month of the ``features`` table and store it in ``feature_sketches``."""
+    def chunks():
+        for batch in store.iter_batches('features', month, columns=features, batch_size=chunk_size):
+            yield batch.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    sketches = FeatureSketches.from_chunks(features, chunks(), lambda chunk: load_fine_edges(store, chunk))
+    store.write(SKETCH_TABLE, sketches.to_frame(), month=month)
+    return sketches
+
+
+def load_feature_sketches(store, months, features):
+    """Merged sketches over ``months`` (building any month that has none yet)."""
+    merged = None
+    stored = set(store.months(SKETCH_TABLE))
+    for month in [to_month(month) for month in months]:
+        if month in stored:
+            sketches = FeatureSketches.from_frame(store.read(SKETCH_TABLE, months=[month]), features)
+        else:
+            sketches = build_feature_sketches(store, month, features)
+        merged = sketches if merged is None else merged.merge(sketches)
+    return merged
+
+
+def ks_statistic(actual, expected):
+    """Kolmogorov-Smirnov distance between two KLL sketches (max CDF gap at any retained item)."""
+    points = np.union1d(np.concatenate(actual.levels), np.concatenate(expected.levels))
+    if not points.size:
+        return 0.0
+    return float(np.max(np.abs(actual.rank(points) - expected.rank(points))))
+
+
+def wasserstein_distance(actual, expected):
+    """1-Wasserstein distance: the mean gap between the two quantile functions."""
+    qs = (np.arange(N_QUANTILES) + 0.5) / N_QUANTILES
+    return float(np.mean(np.abs(actual.quantiles(qs) - expected.quantiles(qs))))
+
+
+def js_divergence(actual_counts, expected_counts):
+    """Jensen-Shannon divergence (base 2, so in [0, 1]) of binned distributions, per row."""
+    p = actual_counts / np.maximum(actual_counts.sum(axis=-1, keepdims=True), 1)
+    q = expected_counts / np.maximum(expected_counts.sum(axis=-1, keepdims=True), 1)
+    m = 0.5 * (p + q)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kl_pm = np.where(p > 0, p * np.log2(p / m), 0.0).sum(axis=-1)
+        kl_qm = np.where(q > 0, q * np.log2(q / m), 0.0).sum(axis=-1)
+    return 0.5 * (kl_pm + kl_qm)
+
+
+def missing_rate(counts):
+    return counts[..., -1] / np.maximum(counts.sum(axis=-1), 1)
+
+
+def sketch_drift(actual, expected):
+    """KS, JS divergence, Wasserstein distance and missing-rate change per feature."""
+    return pd.DataFrame({
+        'Feature': actual.features,
+        'KS': [ks_statistic(a, e) for a, e in zip(actual.quantile_sketches, expected.quantile_sketches)],
+        'JS': js_divergence(actual.counts, expected.counts),
+        'Wasserstein': [wasserstein_distance(a, e)
+                        for a, e in zip(actual.quantile_sketches, expected.quantile_sketches)],
+        'Missing Rate Change': missing_rate(actual.counts) - missing_rate(expected.counts),
+    })
+
+
+def drift_status(frame):
+    """'Warning' where any available statistic passes its threshold, else 'Stable'."""
+    flagged = np.zeros(len(frame), dtype=bool)
+    for column, threshold in DRIFT_THRESHOLDS.items():
+        if column in frame:
+            flagged |= frame[column].abs().to_numpy() > threshold
+    return np.where(flagged, 'Warning', 'Stable')
+
+
+def compare_windows(store, months, baseline_months, features):
+    """Sketch-based drift of ``months`` (merged) against a baseline window, without raw rows."""
+    return sketch_drift(load_feature_sketches(store, months, features),
+                        load_feature_sketches(store, baseline_months, features))
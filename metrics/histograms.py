@@ -0,0 +1,135 @@
+import numpy as np
+
+from data.histograms import N_SCORE_BINS
+from data.snapshot import load_snapshot
+from data.store import to_month
+from metrics.curves import DEFAULT_CURVE_POINTS, downsample_curves
+
+# Curves per (store root, months, segments, model, points), tagged with the
+# months' versions in the store snapshot they were read for
+_curve_cache = {}
+
+
+def has_histograms(store, month):
+    return to_month(month) in store.months('score_histograms')
+
+
+def load_histograms(store, months, segments=None, model=0):
+    """Positive and negative score histograms summed over ``months`` and ``segments``.
+
+    Histograms of any months and segments merge by adding arrays, so every
+    aggregation level costs a read of a few thousand small rows.
+    """
+    filters = [('model', '=', model)]
+    if segments is not None:
+        filters.append(('segment', 'in', list(segments)))
+    cells = store.read('score_histograms', months=months,
+                       columns=['label', 'bin', 'count'], filters=filters)
+
+    key = cells['label'].to_numpy(dtype=np.int64) * N_SCORE_BINS + cells['bin'].to_numpy(dtype=np.int64)
+    counts = np.bincount(key, weights=cells['count'].to_numpy(), minlength=2 * N_SCORE_BINS)
+    negatives, positives = counts.reshape(2, N_SCORE_BINS)
+    return positives, negatives
+
+
+def histogram_summaries(positives, negatives):
+    """AUROC and average precision from histograms along the last axis.
+
+    Works on batches, e.g. (replicates, bins) arrays from a bootstrap.
+    """
+    positives = np.asarray(positives, dtype=np.float64)[..., ::-1]
+    negatives = np.asarray(negatives, dtype=np.float64)[..., ::-1]
+    total_pos = positives.sum(axis=-1)
+    total_neg = negatives.sum(axis=-1)
+    tps = np.cumsum(positives, axis=-1)
+    fps = np.cumsum(negatives, axis=-1)
+
+    # Each positive beats the negatives in lower bins and ties half of its own bin
+    auroc = (np.sum(positives * (total_neg[..., None] - fps + 0.5 * negatives), axis=-1)
+             / (total_pos * total_neg))
+    precision = np.divide(tps, tps + fps, out=np.zeros_like(tps), where=(tps + fps) > 0)
+    average_precision = np.sum(positives * precision, axis=-1) / total_pos
+    return auroc, average_precision
+
+
+def histogram_metrics(positives, negatives):
+    """Approximate ROC/PR curves, AUROC and average precision in O(bins).
+
+    Customers in the same bin are treated as tied. Against the exact
+    row-level computation (metrics.curves.roc_pr_curves) this gives:
+
+    * AUROC: only positive/negative pairs sharing a bin are mis-ordered, so
+      ``|AUROC_hist - AUROC_exact| <= 0.5 * sum_b(pos_b * neg_b) / (P * N)``,
+      returned as ``auroc_error_bound``.
+    * Average precision: a positive in bin b has precision between
+      ``(TP_above + 1) / (TP_above + FP_above + 1 + neg_b)`` and
+      ``(TP_above + pos_b) / (TP_above + FP_above + pos_b)`` whatever the
+      order within the bin, which bounds the exact AP; the larger distance
+      to either bound is returned as ``average_precision_error_bound``.
+    """
+    positives = np.asarray(positives, dtype=np.float64)[::-1]
+    negatives = np.asarray(negatives, dtype=np.float64)[::-1]
+    total_pos, total_neg = positives.sum(), negatives.sum()
+
+    tps = np.cumsum(positives)
+    fps = np.cumsum(negatives)
+    tps_above = tps - positives
+    fps_above = fps - negatives
+
+    # Summaries treat each bin as a tie; the bounds cover any order within bins
+    auroc, average_precision = histogram_summaries(positives[::-1], negatives[::-1])
+    auroc_bound = 0.5 * np.sum(positives * negatives) / (total_pos * total_neg)
+
+    # Average precision at each bin's threshold, with bounds from within-bin order
+    occupied = (tps + fps) > 0
+    precision = np.divide(tps, tps + fps, out=np.zeros_like(tps), where=occupied)
+    weight = positives / total_pos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        low = (tps_above + 1) / (tps_above + fps_above + 1 + negatives)
+        high = (tps_above + positives) / (tps_above + fps_above + positives)
+    has_pos = positives > 0
+    ap_low = np.sum(weight[has_pos] * low[has_pos])
+    ap_high = np.sum(weight[has_pos] * high[has_pos])
+
+    tpr = np.concatenate([[0.0], tps / total_pos])
+    fpr = np.concatenate([[0.0], fps / total_neg])
+    recall = tpr[1:][occupied]
+    precision = precision[occupied]
+
+    return {
+        'fpr': fpr,
+        'tpr': tpr,
+        'recall': np.concatenate([[0.0], recall]),
+        'precision': np.concatenate([[precision[0]], precision]),
+        'auroc': float(auroc),
+        'auroc_error_bound': float(auroc_bound),
+        'average_precision': float(average_precision),
+        'average_precision_error_bound': float(max(average_precision - ap_low, ap_high - average_precision)),
+        'positives': int(total_pos),
+        'negatives': int(total_neg),
+    }
+
+
+def approximate_curves(store, months, segments=None, model=0, n_points=DEFAULT_CURVE_POINTS):
+    """Downsampled curves and summaries for any set of months and segments from histograms.
+
+    Computed once per version of the months in the current snapshot, like
+    ``metrics.curves.month_curves``.
+    """
+    if not isinstance(months, (list, tuple)):
+        months = [months]
+    months = [to_month(month) for month in months]
+    snapshot = load_snapshot(store)
+    versions = tuple(snapshot.month_version(month) for month in months)
+    key = (store.root, tuple(months), None if segments is None else tuple(segments), model, n_points)
+    cached = _curve_cache.get(key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    positives, negatives = load_histograms(store, months, segments=segments, model=model)
+    metrics = histogram_metrics(positives, negatives)
+    result = downsample_curves(metrics, n_points=n_points)
+    result['auroc_error_bound'] = metrics['auroc_error_bound']
+    result['average_precision_error_bound'] = metrics['average_precision_error_bound']
+    _curve_cache[key] = (versions, result)
+    return result
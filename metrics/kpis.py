@@ -0,0 +1,97 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from data.snapshot import load_snapshot
+from data.store import to_month
+from data.synthetic import BUCKETS
+from metrics.bootstrap import load_intervals
+
+# KPI frames per dataset snapshot; a refreshed store yields a new snapshot
+_kpis = weakref.WeakKeyDictionary()
+# Per snapshot, month -> KPI row with its change intervals (see month_kpis)
+_month_rows = weakref.WeakKeyDictionary()
+
+
+def _change(values, relative=False):
+    """Month-over-month change along the first axis; NaN for the first month."""
+    values = np.asarray(values, dtype=np.float64)
+    change = np.full_like(values, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change[1:] = values[1:] / values[:-1] - 1 if relative else values[1:] - values[:-1]
+    return change
+
+
+def compute_kpis(cube, run_dates=None):
+    """Scorecard KPIs for every month of ``cube`` in one pass over its (months, 10, 3) arrays.
+
+    Returns a frame indexed by month with the model run date, customers
+    scored and its relative month-over-month change, and per bucket the
+    share of customers, the conversion rate and the change of each in
+    absolute terms (fractions, e.g. 0.005 is half a percentage point).
+    """
+    customers = cube.customers.sum(axis=1)
+    conversions = cube.conversions.sum(axis=1)
+    total = customers.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = customers / total[:, None]
+        rate = conversions / customers
+
+    # Months without a recorded run date fall back to the month itself
+    months = pd.DatetimeIndex(cube.months, name='month')
+    run_date = months.to_series()
+    if run_dates is not None:
+        run_date = pd.Series(run_dates, dtype='datetime64[ns]').reindex(months).fillna(run_date)
+    columns = {
+        'run_date': run_date.to_numpy(),
+        'customers': total,
+        'customers_change': _change(total, relative=True),
+    }
+    share_change, rate_change = _change(share), _change(rate)
+    for b, bucket in enumerate(BUCKETS):
+        columns[f'share_{bucket}'] = share[:, b]
+        columns[f'share_change_{bucket}'] = share_change[:, b]
+        columns[f'conversion_rate_{bucket}'] = rate[:, b]
+        columns[f'conversion_rate_change_{bucket}'] = rate_change[:, b]
+    return pd.DataFrame(columns, index=months)
+
+
+def run_dates(store):
+    """Latest model run date of each month, from the ``date`` column of the snapshot's decile summary."""
+    index = load_snapshot(store).month_index('decile_summary', ['date'])
+    return pd.Series({month: index.get(month)['date'].max() for month in index.months},
+                     dtype='datetime64[ns]')
+
+
+def load_kpis(store):
+    """The KPI frame of ``store``, computed once per data version."""
+    snapshot = load_snapshot(store)
+    kpis = _kpis.get(snapshot)
+    if kpis is None:
+        kpis = compute_kpis(snapshot.cube, run_dates(store))
+        _kpis[snapshot] = kpis
+    return kpis
+
+
+def month_kpis(store, month):
+    """The KPI row of one month (a Series).
+
+    Each bucket's conversion rate change comes with its 95% bootstrap
+    interval (``conversion_rate_change_{bucket}_lower`` / ``_upper``), NaN
+    when none was computed, so the scorecards can tell a real change from noise.
+    """
+    month = to_month(month)
+    snapshot = load_snapshot(store)
+    rows = _month_rows.setdefault(snapshot, {})
+    kpis = rows.get(month)
+    if kpis is None:
+        intervals = load_intervals(store, month)
+        changes = intervals[intervals['metric'] == 'conversion_rate_change'].set_index('group')
+        bounds = {}
+        for bucket in BUCKETS:
+            found = bucket in changes.index
+            bounds[f'conversion_rate_change_{bucket}_lower'] = changes.at[bucket, 'lower'] if found else np.nan
+            bounds[f'conversion_rate_change_{bucket}_upper'] = changes.at[bucket, 'upper'] if found else np.nan
+        kpis = rows[month] = pd.concat([load_kpis(store).loc[month], pd.Series(bounds, dtype=object)])
+    return kpis
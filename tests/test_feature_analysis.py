@@ -0,0 +1,21 @@
+import inspect
+
+from app import create_app
+from callbacks.clientside import month_payload
+from data.cube import build_cube
+from data.store import build_synthetic_store
+
+
+def test_store_without_feature_drift(tmp_path):
+    # A store built from scores alone has no feature_drift table
+    store = build_synthetic_store(str(tmp_path / 'store'), n_customers=2_000, n_months=2, n_features=3)
+    build_cube(store)
+    month = f"{store.months('decile_summary')[-1]:%Y-%m-%d}"
+
+    assert month_payload(store)['months'][month]['drift']['rows'] == []
+
+    app = create_app({'data_dir': store.root, 'warmup_interval': 0})
+    callback = next(inspect.unwrap(entry['callback']) for key, entry in app.callback_map.items()
+                    if 'feature-drift-table' in key)
+    _, drift_rows = callback(month)
+    assert drift_rows == []
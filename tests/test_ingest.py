@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.cube import load_cube
+from data.ingest import append_month, ingest_month
+from data.store import seed_mock_store, to_month
+
+
+def _month_frame(store, month, **columns):
+    frame = store.read('decile_summary', months=[store.months('decile_summary')[-1]])
+    return frame.assign(month=to_month(month), date=pd.Timestamp(month) + pd.Timedelta(days=19), **columns)
+
+
+def test_append_month_after_cube_is_loaded(tmp_path):
+    store = seed_mock_store(str(tmp_path))
+    version = store.version()
+    load_cube(store)
+
+    assert append_month(store, '2025-05', {'decile_summary': _month_frame(store, '2025-05-01')}) > version
+    assert load_cube(store).months[-1] == to_month('2025-05')
+    assert to_month('2025-05') in store.months('confidence_intervals')
+
+
+def test_replaced_month_bootstraps_new_counts(tmp_path):
+    store = seed_mock_store(str(tmp_path))
+    month = load_cube(store).months[-1]
+    frame = _month_frame(store, month)
+    frame['conversions'] = frame['customers'] // 2
+
+    append_month(store, month, {'decile_summary': frame})
+    intervals = store.read('confidence_intervals', months=[month])
+    rates = intervals.loc[intervals['metric'] == 'decile_conversion_rate', 'estimate']
+    assert rates.between(0.49, 0.51).all()
+
+
+def test_ingest_month_stamps_run_date(tmp_path):
+    store = seed_mock_store(str(tmp_path / 'store'))
+    scores = str(tmp_path / 'scores.csv')
+    pd.DataFrame({'customer_id': np.arange(1_000), 'score': np.linspace(0, 1, 1_000)}).to_csv(scores, index=False)
+
+    ingest_month(store, '2025-05', scores, run_date='2025-06-03')
+    assert store.read('decile_summary', months=['2025-05'])['date'].unique().tolist() == [pd.Timestamp('2025-06-03')]
+
+    # Without a run date the scores file's modification day is used
+    written = pd.Timestamp('2025-07-04 12:00')
+    os.utime(scores, (written.timestamp(), written.timestamp()))
+    ingest_month(store, '2025-06', scores)
+    assert store.read('decile_summary', months=['2025-06'])['date'].unique().tolist() == [written.normalize()]
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from callbacks.clientside import month_payload
+from callbacks.section3_callbacks import model_metrics
+from data.cube import build_cube
+from data.ingest import ingest_month
+from data.store import build_synthetic_store
+from metrics.drift import compute_feature_drift
+
+
+def test_month_without_outcomes(tmp_path):
+    store = build_synthetic_store(str(tmp_path / 'store'), n_customers=2_000, n_months=2, n_features=3)
+    build_cube(store)
+    compute_feature_drift(store, processes=1)
+    # The current month's scores arrive before anyone has converted
+    rng = np.random.default_rng(0)
+    scores = tmp_path / 'scores.csv'
+    pd.DataFrame({'customer_id': np.arange(2_000), 'score': rng.random(2_000)}).to_csv(scores, index=False)
+    month = store.months('decile_summary')[-1] + pd.DateOffset(months=1)
+    ingest_month(store, month, str(scores))
+
+    roc, prc, roc_title, prc_title, cumulative = model_metrics(store, month)
+    assert roc.empty and prc.empty and cumulative.empty
+    assert 'no outcomes yet' in roc_title and 'no outcomes yet' in prc_title
+    assert month_payload(store)['months'][f"{month:%Y-%m-%d}"]['roc']['x'] == []
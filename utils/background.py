@@ -0,0 +1,187 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+
+from dash import DiskcacheManager
+from dash.dependencies import Output
+
+from data.snapshot import load_snapshot
+from utils.instrumentation import attach_timing, collect_timings
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = 'background_cache'
+# Seconds a finished result stays in the manager's cache after it was last read
+DEFAULT_EXPIRE = 600
+# Seconds a request's claim on a job holds before the job is started, and
+# how often a request waiting on that claim checks it
+CLAIM_TIMEOUT = 5
+CLAIM_POLL = 0.01
+_STARTING = 'starting'
+# Held around claims and job starts: a job forked while another thread of
+# this process is inside a diskcache transaction inherits SQLite's lock
+# state and cannot write its result
+_fork_lock = threading.Lock()
+
+SHOWN = {'visibility': 'visible'}
+HIDDEN = {'visibility': 'hidden'}
+
+# set_progress of the background job running in this context (see reports_progress)
+_progress = contextvars.ContextVar('background_progress', default=None)
+
+
+class SharedJobManager(DiskcacheManager):
+    """Diskcache manager that runs identical requests as one job and reports its timing.
+
+    Dash starts a process for every request and only shares the result once
+    it is cached. Here a request whose cache key (callback, inputs, data
+    version) matches a job still running is handed that job and polls it
+    too. The job is claimed under the cache key in a short transaction that
+    only reads and writes keys; the process is started after it. A job is
+    only stopped (a newer month, or its result read) once nobody else waits
+    on it, and progress is read without being consumed, so every waiter
+    sees it.
+
+    The job runs the callback in its own process, outside any request, so
+    ``instrument`` cannot attach its record there. ``reports_progress``
+    leaves it in the cache under the job id instead, and it is reported
+    (``Server-Timing``, /metrics) with each response that carries the
+    result.
+    """
+
+    def _job_key(self, key):
+        return f"{key}-job"
+
+    def _waiters_key(self, job):
+        return f"job-{job}-waiters"
+
+    def timing_key(self, job):
+        return f"job-{job}-timing"
+
+    def _share_or_claim(self, key):
+        # The running job for key (now with one more waiter), or None once
+        # this request has claimed key and is to start the job itself
+        while True:
+            with _fork_lock, self.handle.transact():
+                job = self.handle.get(self._job_key(key))
+                if job is None or (job != _STARTING and not self.job_running(job)):
+                    # Expires in case the claiming request dies before starting the job
+                    self.handle.set(self._job_key(key), _STARTING, expire=CLAIM_TIMEOUT)
+                    return None
+                if job != _STARTING:
+                    self.handle.incr(self._waiters_key(job))
+                    return job
+            # Another request is starting the job; it is recorded once forked
+            time.sleep(CLAIM_POLL)
+
+    def call_job_fn(self, key, job_fn, args, context):
+        job = self._share_or_claim(key)
+        if job is not None:
+            return job
+        # Clear what an earlier job for this key or this pid left behind
+        self.handle.delete(self._make_progress_key(key))
+        try:
+            with _fork_lock:
+                job = super().call_job_fn(key, job_fn, args, context)
+        except BaseException:
+            self.handle.delete(self._job_key(key))
+            raise
+        self.handle.delete(self.timing_key(job))
+        self.handle.set(self._waiters_key(job), 1, expire=self.expire)
+        self.handle.set(self._job_key(key), job, expire=self.expire)
+        return job
+
+    def terminate_job(self, job):
+        if job is None:
+            return
+        with self.handle.transact():
+            if self.handle.decr(self._waiters_key(job), default=1) > 0:
+                return
+            self.handle.delete(self._waiters_key(job))
+        super().terminate_job(job)
+
+    def get_progress(self, key):
+        return self.handle.get(self._make_progress_key(key))
+
+    def get_result(self, key, job):
+        result = super().get_result(key, job)
+        if job is not None and result is not self.UNDEFINED:
+            # Left to expire: every waiter on the job reports it
+            timing = self.handle.get(self.timing_key(job))
+            if timing is not None:
+                attach_timing(timing)
+        return result
+
+
+def background_manager(store, expire=DEFAULT_EXPIRE):
+    """Background callback manager keeping jobs and results in the store root, or None.
+
+    Results are cached per data version, like the callback cache. Returns
+    None, and callbacks run in the request, when ``dash[diskcache]`` is not
+    installed.
+    """
+    try:
+        import diskcache
+        return SharedJobManager(diskcache.Cache(os.path.join(store.root, CACHE_DIR)),
+                                cache_by=[lambda: load_snapshot(store).version], expire=expire)
+    except ImportError:
+        logger.warning("Background callbacks need dash[diskcache]; running them in the request")
+        return None
+
+
+def background_options(manager, progress_id):
+    """``app.callback`` arguments running a month callback on ``manager``; none without one.
+
+    The progress bar ``progress_id`` is shown while the job runs. Changing
+    the month re-fires the same outputs, and Dash then stops the job it
+    replaces, so no cancel input is needed.
+    """
+    if manager is None:
+        return {}
+    return {
+        'background': True,
+        'manager': manager,
+        'progress': Output(progress_id, 'value'),
+        # Dash only applies a truthy default, so a bare 0 would be dropped
+        'progress_default': [0],
+        'running': [(Output(progress_id, 'style'), SHOWN, HIDDEN)],
+    }
+
+
+def reports_progress(manager):
+    """Decorator taking the ``set_progress`` Dash passes a background callback.
+
+    The callback keeps its signature (and its cache keys) and reports
+    through ``report_progress``. Its timing record is left for the
+    manager to report with the result. Without a manager the callback is
+    returned as is.
+    """
+    def decorator(func):
+        if manager is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(set_progress, *args):
+            token = _progress.set(set_progress)
+            try:
+                with collect_timings() as timings:
+                    return func(*args)
+            finally:
+                _progress.reset(token)
+                if timings:
+                    manager.handle.set(manager.timing_key(os.getpid()), timings[-1], expire=manager.expire)
+        return wrapper
+    return decorator
+
+
+def report_progress(done, total):
+    """Move the running background callback's progress bar to ``done`` of ``total`` steps.
+
+    A no-op in a callback that runs in the request.
+    """
+    set_progress = _progress.get()
+    if set_progress is not None:
+        set_progress(round(100 * done / total))
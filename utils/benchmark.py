@@ -0,0 +1,238 @@
+import gc
+import inspect
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from utils.figures import payload_budget
+from utils.startup import ROOT
+
+# Months of history benchmarked: today's 6, then 10 and 100 times as many.
+# Only the history grows; customers per month stay at a fixed sample
+HISTORY_MONTHS = (6, 60, 600)
+# Callbacks read per-month aggregates, whose size does not depend on the
+# customer count, so a modest sample per month keeps long histories
+# buildable. The row-level paths (ingest, histograms, feature sketches) are
+# not measured at production volume here
+DEFAULT_CUSTOMERS = 25_000
+N_FEATURES = 10
+SAMPLED_MONTHS = 12
+REPEATS = 5
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'monitoring-benchmark')
+
+# A measurement regresses when it exceeds its baseline by more than its
+# tolerance (and, for latency, by more than the noise floor). Payload bytes
+# are deterministic; latency varies most between runs
+TOLERANCES = {'p50_s': 0.5, 'p95_s': 0.5, 'peak_bytes': 0.25, 'payload_bytes': 0.05}
+LATENCY_FLOOR_S = 0.002
+
+
+def benchmark_store(data_dir, months, customers=DEFAULT_CUSTOMERS, processes=None):
+    """Synthetic store with ``months`` months of history, built once and reused.
+
+    The parameters are recorded next to the store, so a store built with
+    different settings is rebuilt rather than silently reused.
+    """
+    from data.cube import build_cube
+    from data.store import ParquetStore, build_synthetic_store
+    from metrics.bootstrap import compute_intervals
+    from metrics.drift import compute_feature_drift
+
+    root = os.path.join(data_dir, f'months-{months}')
+    params = {'months': months, 'customers': customers, 'features': N_FEATURES, 'seed': 42}
+    params_file = os.path.join(root, 'benchmark.json')
+    if os.path.exists(params_file):
+        with open(params_file) as f:
+            if json.load(f) == params:
+                return ParquetStore(root)
+
+    shutil.rmtree(root, ignore_errors=True)
+    store = build_synthetic_store(root, n_customers=customers, n_months=params['months'],
+                                  n_features=N_FEATURES, seed=params['seed'])
+    build_cube(store)
+    compute_intervals(store, processes=processes)
+    compute_feature_drift(store, processes=processes)
+    with open(params_file, 'w') as f:
+        json.dump(params, f)
+    return store
+
+
+def registered_callbacks(app):
+    """Name -> (undecorated function, input ids, output key) for every callback of ``app``.
+
+    Unwrapping strips both Dash's request handling and the callback cache,
+    so each call does the callback's full work.
+    """
+    return {
+        inspect.unwrap(entry['callback']).__name__: (inspect.unwrap(entry['callback']),
+                                                     [item['id'] for item in entry['inputs']], output)
+        for output, entry in app.callback_map.items()
+    }
+
+
+def _sampled_months(months, count=SAMPLED_MONTHS):
+    """Up to ``count`` months spread evenly over the history, as month selector values."""
+    picks = np.unique(np.linspace(0, len(months) - 1, min(count, len(months))).round().astype(int))
+    return [f"{months[i]:%Y-%m-%d}" for i in picks]
+
+
+def measure_callback(func, months, repeats=REPEATS):
+    """Latency, peak memory and serialized bytes of one callback over ``months``.
+
+    The first call per month is reported separately (``cold_s``) because it
+    fills per-month caches that later calls reuse. Peak memory is measured
+    in a separate pass under tracemalloc, which would otherwise slow the
+    timed calls, with garbage collected first so earlier calls' cycles do
+    not count.
+    """
+    from plotly.io.json import to_json_plotly
+
+    cold, warm, sizes = [], [], []
+    for month in months:
+        start = time.perf_counter()
+        result = func(month)
+        cold.append(time.perf_counter() - start)
+        sizes.append(len(to_json_plotly(result)))
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(month)
+            warm.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    peak = 0
+    for month in months:
+        gc.collect()
+        tracemalloc.reset_peak()
+        func(month)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        'cold_s': float(np.mean(cold)),
+        'p50_s': float(np.percentile(warm, 50)),
+        'p95_s': float(np.percentile(warm, 95)),
+        'peak_bytes': int(peak),
+        'payload_bytes': int(max(sizes)),
+        'calls': len(cold) + len(warm),
+    }
+
+
+def run_benchmarks(history=HISTORY_MONTHS, data_dir=DEFAULT_DATA_DIR, customers=DEFAULT_CUSTOMERS,
+                   repeats=REPEATS, processes=None):
+    """Measure every registered callback against a store of each history length; no browser needed."""
+    from app import create_app
+
+    results = {}
+    for n_months in history:
+        store = benchmark_store(data_dir, n_months, customers=customers, processes=processes)
+        app = create_app({'data_dir': store.root, 'clientside': False,
+                          'preload': False, 'warmup_interval': 0})
+        months = store.months('decile_summary')
+        sampled = _sampled_months(months)
+        results[f'months-{n_months}'] = {
+            name: dict(measure_callback(func, sampled, repeats=repeats), budget_bytes=payload_budget(output))
+            for name, (func, inputs, output) in sorted(registered_callbacks(app).items())
+            if inputs == ['month-selector']
+        }
+        results[f'months-{n_months}']['_store'] = {'months': len(months), 'customers_per_month': customers}
+    return {
+        'scaling': f"history length only: {customers:,} customers per month at every size",
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(),
+                        'cpus': os.cpu_count()},
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerances=TOLERANCES):
+    """(rows, regressions): per callback and store size, each measurement against its baseline."""
+    rows, regressions = [], []
+    for history, callbacks in current['results'].items():
+        for name, stats in callbacks.items():
+            base = baseline.get('results', {}).get(history, {}).get(name)
+            if name.startswith('_') or base is None:
+                continue
+            for key, tolerance in tolerances.items():
+                ratio = stats[key] / base[key] if base[key] else float('inf') if stats[key] else 1.0
+                floor = LATENCY_FLOOR_S if key.endswith('_s') else 0
+                regressed = ratio > 1 + tolerance and stats[key] - base[key] > floor
+                rows.append((history, name, key, base[key], stats[key], ratio, regressed))
+                if regressed:
+                    regressions.append((history, name, key))
+    return rows, regressions
+
+
+def over_budget(current):
+    """(history, name, payload, budget) for every callback whose payload exceeds its byte budget.
+
+    Budgets are absolute (``utils.figures.PAYLOAD_BUDGETS``), so unlike the
+    baseline comparison they also hold when a new baseline is saved.
+    """
+    return [(history, name, stats['payload_bytes'], stats['budget_bytes'])
+            for history, callbacks in current['results'].items()
+            for name, stats in callbacks.items()
+            if not name.startswith('_') and stats['payload_bytes'] > stats['budget_bytes']]
+
+
+def _format(key, value):
+    return f"{value * 1000:.2f}ms" if key.endswith('_s') else f"{value:,}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark callback latency, memory and payloads '
+                                                 'over growing months of history.')
+    parser.add_argument('--months', type=int, nargs='+', default=list(HISTORY_MONTHS),
+                        help='history lengths to benchmark')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='where the benchmark stores are built and kept')
+    parser.add_argument('--customers', type=int, default=DEFAULT_CUSTOMERS, help='customers per month')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=TOLERANCES['p50_s'],
+                        help='fraction latency may grow over the baseline')
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.months, args.data_dir, args.customers, args.repeats, args.processes)
+    for history, callbacks in current['results'].items():
+        print(f"{history} ({callbacks['_store']['customers_per_month']:,} customers per month):")
+        for name, stats in callbacks.items():
+            if not name.startswith('_'):
+                print(f"  {name:28s} cold {_format('cold_s', stats['cold_s']):>9s}  p50 {_format('p50_s', stats['p50_s']):>9s}"
+                      f"  p95 {_format('p95_s', stats['p95_s']):>9s}  peak {stats['peak_bytes'] / 1e6:7.2f}MB"
+                      f"  payload {stats['payload_bytes']:>8,}B")
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        tolerances = dict(TOLERANCES, p50_s=args.latency_tolerance, p95_s=args.latency_tolerance)
+        rows, regressions = compare(current, baseline, tolerances)
+        changed = [row for row in rows if abs(row[5] - 1) > tolerances[row[2]] or row[6]]
+        print(f"\nagainst {os.path.relpath(args.baseline, ROOT)}: {len(regressions)} regression(s)")
+        for history, name, key, base, value, ratio, regressed in changed:
+            print(f"  {'REGRESSED' if regressed else 'changed  '} {history:>10s} {name:28s} {key:13s}"
+                  f" {_format(key, base):>12s} -> {_format(key, value):>12s} ({ratio:.2f}x)")
+
+    overruns = over_budget(current)
+    for history, name, size, budget in overruns:
+        print(f"  OVER BUDGET {history:>10s} {name:28s} payload {size:,}B > budget {budget:,}B")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"baseline written to {args.baseline}")
+    if overruns or (regressions and not args.save):
+        sys.exit(1)
@@ -0,0 +1,213 @@
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from plotly.basedatatypes import BaseFigure
+
+from data.snapshot import load_snapshot
+from utils.instrumentation import annotate
+
+CACHE_FILE = 'callback_cache.sqlite'
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_SHARED_BYTES = 256 * 1024 * 1024
+# Data versions the shared table keeps: the one served and the one being warmed up
+KEEP_VERSIONS = 2
+
+# One cache per store root, shared by every callback in the process
+_caches = {}
+_caches_lock = threading.Lock()
+
+# Memoized callbacks per store root, by name, so a warm-up can call them ahead of users
+_memoized = {}
+
+
+def _plain(value):
+    # Figures are cached as plain dicts: they pickle and unpickle without
+    # plotly re-validating every property, and Dash serialises them as-is
+    if isinstance(value, BaseFigure):
+        return value.to_plotly_json()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(item) for item in value)
+    return value
+
+
+class CallbackCache:
+    """Two-tier memo of callback results keyed by (callback, inputs, data version).
+
+    The first tier is an in-process LRU of up to ``max_entries`` results. The
+    second is a SQLite file shared by every worker on the host, evicting
+    least recently used rows once it holds more than ``max_bytes``. A new
+    data version never matches an old key. The newest two versions are
+    kept, so the version still being served and the one being warmed up
+    (utils/warmup.py) do not evict each other. Older entries are dropped
+    when a process first sees a newer version; the shared table counts the
+    newest two among the versions stored in it, not the ones this process
+    has seen.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MEMORY_ENTRIES, max_bytes=DEFAULT_SHARED_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = {'memory': 0, 'shared': 0}
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, version INTEGER, value BLOB, size INTEGER, accessed REAL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # A connection per call: sqlite3 connections must not cross threads
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _invalidate(self, version):
+        """Drop entries older than the previous newest version once ``version`` is seen.
+
+        In memory that is the previous version this process saw. The shared
+        table is pruned from the versions stored in it, keeping the newest
+        two, so a worker that starts on a new version does not delete rows
+        other workers still serve.
+        """
+        if self._version is not None and version <= self._version:
+            return
+        with self._lock:
+            if self._version is not None and version <= self._version:
+                return
+            keep = version if self._version is None else self._version
+            self._version = version
+            for key in [key for key, (entry_version, _) in self._memory.items() if entry_version < keep]:
+                del self._memory[key]
+        with self._connect() as conn:
+            stored = [row[0] for row in conn.execute(
+                "SELECT DISTINCT version FROM entries ORDER BY version DESC LIMIT ?", (KEEP_VERSIONS,))]
+            newest = sorted(set(stored) | {version}, reverse=True)[:KEEP_VERSIONS]
+            conn.execute("DELETE FROM entries WHERE version < ?", (newest[-1],))
+
+    def get(self, key, version):
+        """(tier, value) on a hit, tier being 'memory' or 'shared', else (None, None)."""
+        self._invalidate(version)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits['memory'] += 1
+                return 'memory', self._memory[key][1]
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None, None
+
+        value = pickle.loads(row[0])
+        self._remember(key, version, value)
+        with self._lock:
+            self.hits['shared'] += 1
+        return 'shared', value
+
+    def set(self, key, version, value):
+        self._invalidate(version)
+        self._remember(key, version, value)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (key, version, blob, len(blob), time.time()))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total)
+
+    def _evict(self, conn, total):
+        # Least recently used rows first, until the file's entries fit the budget
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def _remember(self, key, version, value):
+        with self._lock:
+            self._memory[key] = (version, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self):
+        """Hit and miss counters for this process, plus the size of both tiers."""
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        with self._lock:
+            lookups = self.hits['memory'] + self.hits['shared'] + self.misses
+            return {
+                'memory_hits': self.hits['memory'],
+                'shared_hits': self.hits['shared'],
+                'misses': self.misses,
+                'hit_rate': (lookups - self.misses) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'shared_entries': entries,
+                'shared_bytes': size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+
+def callback_cache(store):
+    """The callback cache of ``store``; its shared tier lives in the store root."""
+    cache = _caches.get(store.root)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(store.root)
+            if cache is None:
+                cache = CallbackCache(os.path.join(store.root, CACHE_FILE))
+                _caches[store.root] = cache
+    return cache
+
+
+def memoize(store):
+    """Decorator caching a callback's result per (callback, inputs, data version)."""
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            cache = callback_cache(store)
+            version = load_snapshot(store).version
+            key = hashlib.sha1(repr((name, args, version)).encode()).hexdigest()
+            tier, value = cache.get(key, version)
+            annotate(cache=tier or 'miss')
+            if tier:
+                return value
+            value = _plain(func(*args))
+            cache.set(key, version, value)
+            return value
+
+        _memoized.setdefault(store.root, {})[name] = wrapper
+        return wrapper
+    return decorator
+
+
+def memoized_callbacks(store):
+    """Name -> memoized callback for every callback registered with ``memoize(store)``."""
+    return dict(_memoized.get(store.root, {}))
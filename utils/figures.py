@@ -0,0 +1,158 @@
+import functools
+import importlib
+import logging
+
+import numpy as np
+import plotly.io as pio
+from flask import request
+
+from utils.instrumentation import increment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAYLOAD_BUDGET = 60_000
+
+# Response byte budget per component; a callback's budget is the sum over its outputs
+PAYLOAD_BUDGETS = {
+    'decile-distribution-chart': 20_000,
+    'decile-conversion-chart': 20_000,
+    'roc-curve': 20_000,
+    'prc-curve': 20_000,
+    'cumulative-recall-chart': 10_000,
+    'cumulative-precision-chart': 10_000,
+    'feature-importance-chart': 10_000,
+    'feature-drift-table': 10_000,
+    'kpi-run-date': 500,
+    'kpi-customers': 500,
+    'kpi-share-low': 500,
+    'kpi-share-medium': 500,
+    'kpi-share-high': 500,
+    'kpi-conversion-rate-low': 500,
+    'kpi-conversion-rate-medium': 500,
+    'kpi-conversion-rate-high': 500,
+}
+
+# Layout keys of the default template these charts use; the rest (polar,
+# ternary, geo, 3D scenes, colorscales, ...) is most of its bytes
+TEMPLATE_LAYOUT_KEYS = ('autotypenumbers', 'colorway', 'font', 'hovermode', 'hoverlabel',
+                        'paper_bgcolor', 'plot_bgcolor', 'coloraxis', 'xaxis', 'yaxis', 'title')
+TEMPLATE_TRACE_TYPES = ('bar', 'scatter')
+
+# Byte sizes of callback responses per output key: count, last and max
+_payload_sizes = {}
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+# Figure code reaches plotly through these. Plotly Express is a large share of
+# `import app`, so it is only imported when the first figure is drawn
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+
+
+def lean_template(base='plotly'):
+    """The ``base`` template cut down to the layout and trace defaults the dashboard uses."""
+    template = pio.templates[base]
+    layout = template.layout.to_plotly_json()
+    data = template.data.to_plotly_json()
+    return go.layout.Template(
+        layout={key: layout[key] for key in TEMPLATE_LAYOUT_KEYS if key in layout},
+        data={key: data[key] for key in TEMPLATE_TRACE_TYPES if key in data},
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def figure_template():
+    """The shared lean template, passed to every figure the dashboard draws.
+
+    Building it loads plotly's full default template, so it is done when
+    the first figure is drawn rather than at import. plotly's global
+    default template is left as it is.
+    """
+    return lean_template()
+
+
+# Plotly picks its JSON engine from this setting; orjson is several times
+# faster than the standard library encoder on figure-sized payloads
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+
+def _compact_array(values):
+    """float64 -> float32 and wide ints -> the narrowest int type that holds them.
+
+    Plotly encodes numeric numpy arrays as base64 typed arrays, so halving
+    the item size halves the bytes on the wire.
+    """
+    if isinstance(values, (list, tuple)):
+        if not values or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            return values
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray):
+        return values
+    if values.dtype.kind == 'f' and values.dtype.itemsize > 4:
+        return values.astype(np.float32)
+    if values.dtype.kind in 'iu' and values.size:
+        return values.astype(np.result_type(np.min_scalar_type(values.min()),
+                                             np.min_scalar_type(values.max())))
+    return values
+
+
+def compact_figure(fig):
+    """Trim a figure for the wire: 32-bit floats and narrow ints."""
+    for trace in fig.data:
+        for prop in ('x', 'y', 'z', 'customdata'):
+            if prop in trace and trace[prop] is not None:
+                trace[prop] = _compact_array(trace[prop])
+        error_y = getattr(trace, 'error_y', None)
+        if error_y is not None and error_y.array is not None:
+            error_y.array = _compact_array(error_y.array)
+            error_y.arrayminus = _compact_array(error_y.arrayminus)
+    return fig
+
+
+def payload_budget(output):
+    """Byte budget of a callback from its output key (e.g. '..roc-curve.figure...prc-curve.figure..')."""
+    ids = [part.rsplit('.', 1)[0] for part in output.strip('.').split('...')]
+    return sum(PAYLOAD_BUDGETS.get(component, DEFAULT_PAYLOAD_BUDGET) for component in ids)
+
+
+def record_payload(output, size):
+    """Track one response size; one over the callback's budget is logged and counted in /metrics."""
+    stats = _payload_sizes.setdefault(output, {'count': 0, 'last': 0, 'max': 0})
+    stats['count'] += 1
+    stats['last'] = size
+    stats['max'] = max(stats['max'], size)
+    budget = payload_budget(output)
+    if size > budget:
+        logger.warning("Callback %s returned %d bytes, over its %d byte budget", output, size, budget)
+        increment('monitoring_callback_payload_over_budget_total', output=output)
+    return size <= budget
+
+
+def payload_sizes():
+    """Response size stats per callback output, with the budget each is held to."""
+    return {output: dict(stats, budget=payload_budget(output)) for output, stats in _payload_sizes.items()}
+
+
+def register_payload_monitor(app):
+    """Record the byte size of every callback response the Dash app sends."""
+    @app.server.after_request
+    def _record_callback_payload(response):
+        if (response.status_code == 200 and request.path.endswith('/_dash-update-component')
+                and not response.direct_passthrough):
+            body = request.get_json(silent=True) or {}
+            if 'output' in body:
+                record_payload(body['output'], response.calculate_content_length() or 0)
+        return response
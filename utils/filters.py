@@ -1,15 +1,52 @@
+import logging
+import weakref
+
 import pandas as pd
 
-def filter_by_month(df, selected_month):
-    """Filter dataframe by selected month."""
-    print(selected_month)
-    print(df['month'])
-    return df[df['month'] == selected_month]
+from data.snapshot import MonthIndex, load_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Month indexes of in-memory frames by id(); DataFrames are unhashable, so an
+# entry is dropped by a finalizer when its frame is collected
+_frame_indexes = {}
+
+
+def month_index(source, table=None, columns=None):
+    """The ``MonthIndex`` for a DataFrame or a store table, built once per frame or store version."""
+    if isinstance(source, pd.DataFrame):
+        index = _frame_indexes.get(id(source))
+        if index is None:
+            index = _frame_indexes[id(source)] = MonthIndex.from_frame(source)
+            weakref.finalize(source, _frame_indexes.pop, id(source), None)
+        return index
+    return load_snapshot(source).month_index(table, columns)
+
+
+def filter_by_month(source, selected_month, table=None, columns=None):
+    """Filter data by selected month.
+
+    ``source`` is either a DataFrame or a ParquetStore (with the ``table`` to
+    read). Either way the rows come from a month index built once, so this
+    is a dict lookup rather than a scan of the month column.
+    """
+    rows = month_index(source, table, columns).get(selected_month)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("filter_by_month %s %s: %d rows", table or 'frame', selected_month, len(rows))
+    return rows
 
-def get_latest_month(df):
+def get_latest_month(source, table='decile_summary'):
     """Get the most recent month from the data."""
-    return df['month'].max()
+    if isinstance(source, pd.DataFrame):
+        return month_index(source).latest_month
+    return get_all_months(source, table)[-1]
 
-def get_all_months(df):
+def get_all_months(source, table='decile_summary'):
     """Get sorted list of all months in the data."""
-    return sorted(df['month'].unique())
+    if isinstance(source, pd.DataFrame):
+        return list(month_index(source).months)
+    # The cube's months are the decile summary's, already parsed in the snapshot
+    snapshot = load_snapshot(source)
+    if table == 'decile_summary':
+        return list(snapshot.months)
+    return sorted(snapshot.table_months.get(table, ()))
@@ -0,0 +1,224 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+
+from flask import Response, g, has_request_context
+
+# Histogram bucket upper bounds, in seconds and bytes
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 200_000, 500_000, 1_000_000)
+PHASES = ('wall', 'data', 'figure', 'serialize')
+
+# Timing record of the callback running in this context (see instrument)
+_current = contextvars.ContextVar('callback_timing', default=None)
+# Records of callbacks that ran outside a request, e.g. in a background job (see collect_timings)
+_collected = contextvars.ContextVar('collected_timings', default=None)
+
+# Histograms and counters by (metric name, labels), for this process
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition layout."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            yield f'{name}_bucket{_labels(labels, le=le)} {cumulative}'
+        yield f'{name}_sum{_labels(labels)} {self.sum!r}'
+        yield f'{name}_count{_labels(labels)} {self.count}'
+
+
+def _labels(labels, **extra):
+    items = {**dict(labels), **extra}
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items.items()) + '}' if items else ''
+
+
+def observe(name, value, buckets=DURATION_BUCKETS, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def increment(name, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Count the time spent in the block towards ``name`` of the running callback.
+
+    A no-op outside an instrumented callback, e.g. during a warm-up.
+    """
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing[name] = timing.get(name, 0.0) + time.perf_counter() - start
+
+
+def annotate(**values):
+    """Attach values (e.g. which cache tier answered) to the running callback's record."""
+    timing = _current.get()
+    if timing is not None:
+        timing.update(values)
+
+
+def instrument(func):
+    """Record wall, data-access and figure-build time of a Dash callback.
+
+    Data access is whatever the callback wraps in ``phase('data')``; the
+    rest of its time counts as building the figure. Serialisation and
+    response size are added once Dash has written the response (see
+    ``register_instrumentation``).
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        timing = {'callback': func.__name__}
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timing['wall'] = time.perf_counter() - start
+            timing['figure'] = max(timing['wall'] - timing.get('data', 0.0), 0.0)
+            _current.reset(token)
+            # A background job is forked inside a request and inherits its
+            # context, so a collector takes precedence over the request
+            if _collected.get() is not None:
+                _collected.get().append(timing)
+            elif has_request_context():
+                g.callback_timing = timing
+    return wrapper
+
+
+@contextlib.contextmanager
+def collect_timings():
+    """Collect the records of instrumented callbacks run in the block instead of attaching them to the request."""
+    timings = []
+    token = _collected.set(timings)
+    try:
+        yield timings
+    finally:
+        _collected.reset(token)
+
+
+def attach_timing(timing):
+    """Report ``timing``, recorded elsewhere, as the current request's callback record."""
+    timing['background'] = True
+    g.callback_timing = timing
+
+
+def server_timing(timing):
+    """``Server-Timing`` header value of one callback's phases, in milliseconds."""
+    parts = [f"{name};dur={timing[name] * 1000:.2f}" for name in PHASES[1:] if name in timing]
+    parts.append(f"callback;dur={timing['wall'] * 1000:.2f};desc=\"{timing['callback']}\"")
+    if 'cache' in timing:
+        parts.append(f"cache;desc=\"{timing['cache']}\"")
+    return ', '.join(parts)
+
+
+def render_metrics(store, warmup=None):
+    """Every histogram and counter of this process, plus cache and warm-up gauges, as Prometheus text."""
+    # utils.cache reports cache hits through annotate(), so it imports this module
+    from utils.cache import callback_cache
+
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    for name in sorted({name for (name, _), _ in histograms}):
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), histogram in histograms:
+            if metric == name:
+                lines.extend(histogram.lines(name, labels))
+    for name in sorted({name for (name, _), _ in counters}):
+        lines.append(f'# TYPE {name} counter')
+        lines.extend(f'{name}{_labels(labels)} {value}' for (metric, labels), value in counters if metric == name)
+
+    stats = callback_cache(store).stats()
+    gauges = {
+        'monitoring_callback_cache_hit_ratio': stats['hit_rate'],
+        'monitoring_callback_cache_memory_entries': stats['memory_entries'],
+        'monitoring_callback_cache_shared_entries': stats['shared_entries'],
+        'monitoring_callback_cache_shared_bytes': stats['shared_bytes'],
+    }
+    if warmup is not None:
+        status = warmup.status()
+        gauges['monitoring_warmup_in_progress'] = int(status['state'] == 'warming')
+        gauges['monitoring_warmup_progress'] = status['progress'] or 0.0
+        if status['last_duration_s'] is not None:
+            gauges['monitoring_warmup_last_duration_seconds'] = status['last_duration_s']
+        if status['serving_version'] is not None:
+            gauges['monitoring_data_version'] = status['serving_version']
+    for name, value in gauges.items():
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def register_instrumentation(app, store):
+    """Time every callback response, add ``Server-Timing`` headers and serve ``/metrics``.
+
+    Metrics are kept per process; under gunicorn each worker reports its own.
+    """
+    @app.server.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.server.after_request
+    def _record_timing(response):
+        timing = g.pop('callback_timing', None)
+        elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+        if timing is None:
+            response.headers['Server-Timing'] = f"total;dur={elapsed * 1000:.2f}"
+            return response
+
+        # Dash encodes the callback's return value after it returns, so the
+        # rest of the request is serialisation (and Dash's own handling). A
+        # background job's result is only read and encoded by this request
+        timing['serialize'] = elapsed if timing.get('background') else max(elapsed - timing['wall'], 0.0)
+        callback = timing['callback']
+        for name in PHASES:
+            observe('monitoring_callback_duration_seconds', timing.get(name, 0.0),
+                    callback=callback, phase=name)
+        if not response.direct_passthrough:
+            observe('monitoring_callback_response_bytes', response.calculate_content_length() or 0,
+                    buckets=BYTES_BUCKETS, callback=callback)
+        increment('monitoring_callback_requests_total', callback=callback, status=response.status_code)
+        if 'cache' in timing:
+            increment('monitoring_callback_cache_total', callback=callback, result=timing['cache'])
+        response.headers['Server-Timing'] = server_timing(timing) + f", total;dur={elapsed * 1000:.2f}"
+        return response
+
+    @app.server.route('/metrics')
+    def _metrics():
+        return Response(render_metrics(store, getattr(app, 'warmup', None)),
+                        mimetype='text/plain; version=0.0.4')
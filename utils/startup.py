@@ -0,0 +1,174 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+COLD_START_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+dash_app = app.create_app(json.loads(sys.argv[1]))
+t2 = time.perf_counter()
+client = dash_app.server.test_client()
+client.get('/_dash-layout')
+t3 = time.perf_counter()
+with open('/proc/self/status') as f:
+    rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) * 1024
+print(json.dumps({'import_s': t1 - t0, 'create_app_s': t2 - t1, 'first_layout_s': t3 - t2,
+                  'total_s': t3 - t0, 'rss_bytes': rss}))
+"""
+
+
+def measure_cold_start(config=None):
+    """Import, ``create_app`` and first-layout times plus RSS of a fresh process."""
+    result = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, json.dumps(config or {})],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def profile_imports(module='app', top=25):
+    """Per-module import cost of ``module`` in a fresh interpreter, from ``python -X importtime``.
+
+    Returns ``{'total_s', 'modules', 'packages'}``: the slowest modules by
+    cumulative time (self time included) and self time summed per top-level
+    package, which shows which dependencies dominate startup.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({'module': name.strip(), 'depth': (len(name) - len(name.lstrip())) // 2,
+                        'self_s': int(self_us) / 1e6, 'cumulative_s': int(cumulative_us) / 1e6})
+
+    packages = {}
+    for entry in modules:
+        package = entry['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + entry['self_s']
+    total = next((entry['cumulative_s'] for entry in modules if entry['module'] == module), 0.0)
+    return {
+        'total_s': total,
+        'modules': sorted(modules, key=lambda entry: -entry['cumulative_s'])[:top],
+        'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:top]),
+    }
+
+
+def memory_usage(pid):
+    """Rss, Pss and private/shared bytes of a process from /proc/<pid>/smaps_rollup (Linux).
+
+    Pss splits every shared page between the processes mapping it, so the
+    Pss of forked workers shows what copy-on-write sharing actually saves.
+    """
+    usage = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {
+        'rss': usage.get('Rss', 0),
+        'pss': usage.get('Pss', 0),
+        'shared': usage.get('Shared_Clean', 0) + usage.get('Shared_Dirty', 0),
+        'private': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure_workers(workers=4, preload=True, config=None, requests=20, timeout=120):
+    """Start gunicorn with ``workers`` workers, exercise it and report per-worker memory.
+
+    With ``preload`` the master runs ``create_app`` (with data preloaded)
+    before forking, so workers share the loaded arrays copy-on-write.
+    Returns the time until the first response and the master's and each
+    worker's memory usage.
+    """
+    port = _free_port()
+    env = dict(os.environ, MONITORING_PRELOAD='1' if preload else '0')
+    if config and 'data_dir' in config:
+        env['MONITORING_DATA_DIR'] = config['data_dir']
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+               'app:create_server()']
+    if preload:
+        command.insert(3, '--preload')
+
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f'http://127.0.0.1:{port}/_dash-layout'
+        while True:
+            try:
+                urllib.request.urlopen(url, timeout=timeout).read()
+                break
+            except OSError:
+                if server.poll() is not None or time.perf_counter() - start > timeout:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.05)
+        first_response = time.perf_counter() - start
+
+        # Spread some page loads over the workers so each has served requests
+        for _ in range(requests):
+            urllib.request.urlopen(url, timeout=timeout).read()
+
+        worker_usage = [memory_usage(pid) for pid in _children(server.pid)]
+        return {
+            'workers': workers,
+            'preload': preload,
+            'first_response_s': first_response,
+            'master': memory_usage(server.pid),
+            'worker_memory': worker_usage,
+            'total_pss': memory_usage(server.pid)['pss'] + sum(usage['pss'] for usage in worker_usage),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure cold start time and per-worker memory.')
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--skip-workers', action='store_true', help='only measure a single cold start')
+    parser.add_argument('--imports', action='store_true', help='also profile per-module import cost')
+    parser.add_argument('--top', type=int, default=25)
+    args = parser.parse_args()
+
+    config = {'data_dir': args.data_dir} if args.data_dir else {}
+    # The app only reads the store, so an empty one is seeded before it starts
+    from app import DEFAULT_CONFIG
+    from data.store import seed_mock_store
+    seed_mock_store(config.get('data_dir', DEFAULT_CONFIG['data_dir']))
+    if args.imports:
+        profile = profile_imports(top=args.top)
+        print(f"import app: {profile['total_s']:.3f}s")
+        print('slowest modules (cumulative / self):')
+        for entry in profile['modules']:
+            print(f"  {entry['cumulative_s']:8.3f}s {entry['self_s']:8.3f}s  {'  ' * entry['depth']}{entry['module']}")
+        print('self time by package:')
+        for package, seconds in profile['packages'].items():
+            print(f"  {seconds:8.3f}s  {package}")
+    print('cold start:', json.dumps(measure_cold_start(config), indent=2))
+    if not args.skip_workers:
+        for preload in (False, True):
+            print(f'gunicorn preload={preload}:', json.dumps(measure_workers(args.workers, preload, config),
+                                                             indent=2))
@@ -0,0 +1,167 @@
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify
+
+from callbacks.clientside import month_payload
+from callbacks.static_figures import static_figures
+from data.snapshot import (build_snapshot, is_current, manage_snapshots, published_snapshot,
+                           publish_snapshot, using_snapshot)
+from metrics.kpis import load_kpis
+from utils.cache import memoized_callbacks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5.0
+MAX_REPORTED_ERRORS = 20
+
+
+class WarmupScheduler:
+    """Precomputes everything for a new data version in the background, then swaps it in.
+
+    A daemon thread checks the store's manifest every ``interval`` seconds.
+    When it changes, a new snapshot is built to the side and every
+    per-version cache is filled for it on a pool of ``workers`` threads:
+    the static figures, the KPIs, the clientside payload and each memoized
+    callback (figures and drift tables) for every month. Only then is the
+    snapshot published, with one assignment. Until that moment requests are
+    answered from the old version and never wait on the warm-up.
+
+    Threads rather than processes do the work because the results have to
+    end up in this process's caches; the callback cache's shared SQLite tier
+    makes them available to the other workers as well.
+    """
+
+    def __init__(self, store, interval=DEFAULT_INTERVAL, workers=None, clientside=False):
+        self.store = store
+        self.interval = interval
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.clientside = clientside
+        self._status = {
+            'state': 'idle',
+            'warming_version': None,
+            'done': 0,
+            'total': 0,
+            'started_at': None,
+            'last_version': None,
+            'last_duration_s': None,
+            'warmups': 0,
+            'errors': [],
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def tasks(self, snapshot):
+        """(name, function) pairs that fill every per-version cache for ``snapshot``."""
+        tasks = [('static_figures', functools.partial(static_figures, self.store)),
+                 ('kpis', functools.partial(load_kpis, self.store))]
+        if self.clientside:
+            tasks.append(('month_payload', functools.partial(month_payload, self.store)))
+        for name, callback in memoized_callbacks(self.store).items():
+            for month in snapshot.months:
+                # Called with the month selector's value, so the keys match user requests
+                value = f"{month:%Y-%m-%d}"
+                tasks.append((f"{name}({value})", functools.partial(callback, value)))
+        return tasks
+
+    def _run(self, snapshot, name, func):
+        try:
+            with using_snapshot(snapshot):
+                func()
+        except Exception:
+            logger.exception("Warm-up task %s failed for version %d", name, snapshot.version)
+            with self._lock:
+                if len(self._status['errors']) < MAX_REPORTED_ERRORS:
+                    self._status['errors'].append(name)
+        with self._lock:
+            self._status['done'] += 1
+
+    def warm(self):
+        """Build, warm up and publish a snapshot of the store as it is now; returns the seconds taken.
+
+        A task that fails is logged and reported in ``status()``; the snapshot
+        is published regardless, as the request would fail the same way.
+        """
+        start = time.perf_counter()
+        stamp, snapshot = build_snapshot(self.store)
+        tasks = self.tasks(snapshot)
+        with self._lock:
+            self._status.update(state='warming', warming_version=snapshot.version, done=0,
+                                total=len(tasks), started_at=time.time(), errors=[])
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='warmup') as pool:
+            for future in [pool.submit(self._run, snapshot, name, func) for name, func in tasks]:
+                future.result()
+
+        publish_snapshot(self.store, stamp, snapshot)
+        duration = time.perf_counter() - start
+        with self._lock:
+            self._status.update(state='idle', warming_version=None, last_version=snapshot.version,
+                                last_duration_s=duration, warmups=self._status['warmups'] + 1)
+        logger.info("Warmed up version %d in %.2fs (%d tasks, %d failed)",
+                    snapshot.version, duration, len(tasks), len(self._status['errors']))
+        return duration
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if not is_current(self.store):
+                try:
+                    self.warm()
+                except Exception:
+                    logger.exception("Warm-up of %s failed", self.store.root)
+                    with self._lock:
+                        self._status.update(state='failed', warming_version=None)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start polling in this process; cheap to call again, e.g. on every request.
+
+        Threads do not survive a fork, so under ``gunicorn --preload`` each
+        worker starts its own scheduler on its first request.
+        """
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return self
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return self
+            manage_snapshots(self.store)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='warmup-scheduler', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+        return self
+
+    def stop(self):
+        """Stop polling; requests go back to swapping in new versions themselves."""
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join()
+        manage_snapshots(self.store, managed=False)
+
+    def status(self):
+        """Serving version, warm-up progress and how long the last warm-up took."""
+        with self._lock:
+            status = dict(self._status, errors=list(self._status['errors']))
+        snapshot = published_snapshot(self.store)
+        status['serving_version'] = None if snapshot is None else snapshot.version
+        status['progress'] = status['done'] / status['total'] if status['total'] else None
+        if status['state'] == 'warming':
+            status['elapsed_s'] = time.time() - status['started_at']
+        return status
+
+
+def register_warmup(app, scheduler):
+    """Start ``scheduler`` with the first request of each process and serve its status at /warmup."""
+    @app.server.before_request
+    def _start_warmup():
+        scheduler.start()
+
+    @app.server.route('/warmup')
+    def _warmup_status():
+        return jsonify(scheduler.status())